@@ -1,9 +1,21 @@
 from pathlib import Path
 import os
+import traceback
 from flask import Flask
 from flask_cors import CORS
 
-from .services.extensions import swagger, mail
+from .services.extensions import mail, create_swagger, resolve_swagger_specs, LazySwaggerDocs
+from .services.emails import emails
+from .services.error_reporting import error_reporter
+from .services.tracing import tracer
+from .services.profiling import profiler
+from .services.recording import recorder
+from .services import admission, call_budget, deadline
+from .services.serialization import register_serialization
+from .services.replica import replica
+from .services.cache import cache
+from .services.background import run_periodically
+from .configs.config import READ_REPLICA_RECONCILE_INTERVAL, CACHE_REFRESH_INTERVAL, CACHE_WARM_UP, SWAGGER_MODE
 
 
 def create_app() -> Flask:
@@ -15,7 +27,13 @@ def create_app() -> Flask:
     CORS(app)
 
     register_extensions(app)
+    register_serialization(app)
     register_blueprints(app)
+    register_swagger(app)
+    register_background_tasks(app)
+
+    if CACHE_WARM_UP:
+        warm_up(app)
 
     return app
 
@@ -23,7 +41,15 @@ def create_app() -> Flask:
 def register_extensions(app: Flask) -> None:
     """Register Flask extensions."""
     mail.init_app(app)
-    swagger.init_app(app)
+    emails.init_app(app)
+    error_reporter.init_app(app)
+    tracer.init_app(app)
+    profiler.init_app(app)
+    call_budget.init_app(app)
+    deadline.init_app(app)
+    admission.init_app(app)
+    recorder.init_app(app)
+    replica.init_app(app)
 
     return None
 
@@ -34,3 +60,57 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(main_blueprint)
 
     return None
+
+
+def register_swagger(app: Flask) -> None:
+    """
+    Register Swagger docs by SWAGGER_MODE: "eager" on startup, "lazy" on the first docs request, "off" disabled.
+    """
+    if SWAGGER_MODE == "eager":
+        create_swagger().init_app(app)
+        resolve_swagger_specs(app)
+
+    elif SWAGGER_MODE == "lazy":
+        app.wsgi_app = LazySwaggerDocs(app.wsgi_app, create_docs_app)
+
+    return None
+
+
+def create_docs_app() -> Flask:
+    """Create Flask app serving only Swagger docs of all bridge blueprints."""
+    docs_app = Flask("classmarker_fabman_bridge_docs")
+    docs_app.config.from_object("application.configs.flask_config_file")
+
+    create_swagger().init_app(docs_app)
+    register_blueprints(docs_app)
+    resolve_swagger_specs(docs_app)
+
+    return docs_app
+
+
+def register_background_tasks(app: Flask) -> None:
+    """Register periodic background tasks."""
+    from application.services.api_functions import reconcile_replica
+
+    if replica.enabled:
+        run_periodically("replica-reconcile", READ_REPLICA_RECONCILE_INTERVAL, reconcile_replica, app)
+
+    if cache.enabled:
+        run_periodically("cache-refresh", CACHE_REFRESH_INTERVAL, cache.refresh_hot, app, CACHE_REFRESH_INTERVAL)
+
+    return None
+
+
+def warm_up(app: Flask) -> None:
+    """Fetch training-courses catalogs into cache before the first request."""
+    from application.services.api_functions import warm_up_cache
+
+    try:
+        with app.app_context():
+            warm_up_cache()
+
+    except Exception:
+        print("ERROR DURING CACHE WARM UP:")
+        print(traceback.format_exc())
+
+    return None
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 MAX_COURSE_ATTEMPTS = os.getenv("MAX_COURSE_ATTEMPTS", 3)
@@ -13,3 +14,57 @@ FABLAB_SUPPORT_EMAIL = os.getenv("FABLAB_SUPPORT_EMAIL")
 VERIFY_CLASSMARKER_REQUESTS = os.getenv("VERIFY_CLASSMARKER_REQUESTS")
 TRACK_TIME = os.getenv("TRACK_TIME")
 COURSES_WEB_PRIVATE_KEY = os.getenv("COURSES_WEB_PRIVATE_KEY")
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "orjson")
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+READ_REPLICA_PATH = os.getenv("READ_REPLICA_PATH")
+READ_REPLICA_RECONCILE_INTERVAL = float(os.getenv("READ_REPLICA_RECONCILE_INTERVAL", "3600"))
+READ_REPLICA_MAX_STALENESS = float(os.getenv("READ_REPLICA_MAX_STALENESS", str(2 * READ_REPLICA_RECONCILE_INTERVAL)))
+FABMAN_WEBHOOK_TOKEN = os.getenv("FABMAN_WEBHOOK_TOKEN")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "0"))
+CACHE_MAX_STALE = float(os.getenv("CACHE_MAX_STALE", "300"))
+CACHE_REFRESH_AHEAD = float(os.getenv("CACHE_REFRESH_AHEAD", "0.8"))
+CACHE_REFRESH_INTERVAL = float(os.getenv("CACHE_REFRESH_INTERVAL", "5"))
+CACHE_WARM_UP = os.getenv("CACHE_WARM_UP", "False").lower() == "true"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(tempfile.gettempdir(), "fablab_bridge_cache.sqlite"))
+SWAGGER_MODE = os.getenv("SWAGGER_MODE", "lazy")
+EMAIL_RENDER_CACHE_SIZE = int(os.getenv("EMAIL_RENDER_CACHE_SIZE", "256"))
+ERROR_ALERT_INTERVAL = float(os.getenv("ERROR_ALERT_INTERVAL", "3600"))
+ERROR_DIGEST_INTERVAL = float(os.getenv("ERROR_DIGEST_INTERVAL", "3600"))
+ERROR_QUEUE_SIZE = int(os.getenv("ERROR_QUEUE_SIZE", "1000"))
+FABMAN_API_URL = os.getenv("FABMAN_API_URL", "https://fabman.io/api/v1")
+FABMAN_TIMEOUT = float(os.getenv("FABMAN_TIMEOUT", "10"))
+FABMAN_BREAKER_FAILURE_RATE = float(os.getenv("FABMAN_BREAKER_FAILURE_RATE", "0.5"))
+FABMAN_BREAKER_MIN_CALLS = int(os.getenv("FABMAN_BREAKER_MIN_CALLS", "10"))
+FABMAN_BREAKER_WINDOW = int(os.getenv("FABMAN_BREAKER_WINDOW", "20"))
+FABMAN_BREAKER_SLOW_CALL = float(os.getenv("FABMAN_BREAKER_SLOW_CALL", "5"))
+FABMAN_BREAKER_OPEN_SECONDS = float(os.getenv("FABMAN_BREAKER_OPEN_SECONDS", "30"))
+FABMAN_LAST_GOOD_SIZE = int(os.getenv("FABMAN_LAST_GOOD_SIZE", "1000"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_STACK_INTERVAL = float(os.getenv("PROFILE_STACK_INTERVAL", "0.005"))
+CALL_BUDGET_DEBUG = os.getenv("CALL_BUDGET_DEBUG", "False").lower() == "true"
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+MIN_CALL_TIMEOUT = float(os.getenv("MIN_CALL_TIMEOUT", "0.5"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+MEMBER_LOCK_DIR = os.getenv("MEMBER_LOCK_DIR", os.path.join(tempfile.gettempdir(), "fablab_bridge_locks"))
+MEMBER_LOCK_TIMEOUT = float(os.getenv("MEMBER_LOCK_TIMEOUT", "30"))
+MEMBER_UPDATE_RETRIES = int(os.getenv("MEMBER_UPDATE_RETRIES", "3"))
+BATCH_MAX_MEMBERS = int(os.getenv("BATCH_MAX_MEMBERS", "100"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+ADMISSION_WEBHOOK_LIMIT = int(os.getenv("ADMISSION_WEBHOOK_LIMIT", "4"))
+ADMISSION_WEBHOOK_QUEUE = int(os.getenv("ADMISSION_WEBHOOK_QUEUE", "20"))
+ADMISSION_READS_LIMIT = int(os.getenv("ADMISSION_READS_LIMIT", "8"))
+ADMISSION_READS_QUEUE = int(os.getenv("ADMISSION_READS_QUEUE", "16"))
+ADMISSION_EXPIRATION_LIMIT = int(os.getenv("ADMISSION_EXPIRATION_LIMIT", "2"))
+ADMISSION_EXPIRATION_QUEUE = int(os.getenv("ADMISSION_EXPIRATION_QUEUE", "4"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "10"))
+FABMAN_MAX_CONCURRENCY = int(os.getenv("FABMAN_MAX_CONCURRENCY", "8"))
+FABMAN_BATCH_CONCURRENCY = int(os.getenv("FABMAN_BATCH_CONCURRENCY", "4"))
+FABMAN_RATE_LIMIT = float(os.getenv("FABMAN_RATE_LIMIT", "0"))
+RECORD_PATH = os.getenv("RECORD_PATH")
@@ -188,6 +188,45 @@ expiration_schema = {
     }
 }
 
+member_changed_schema = {
+    "tags": [
+        "training-expiration"
+    ],
+    "security": [
+        {
+            "cronjob_token": []
+        }
+    ],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "type": "object",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "member_id": {
+                        "type": "integer"
+                    }
+                },
+                "example": {
+                    "member_id": 234567
+                }
+            }
+        }
+    ],
+    "consumes": [
+        TYPE_JSON
+    ],
+    "deprecated": False,
+    "responses": {
+        "200": {
+            "description": "Read replica and cache entries of member invalidated"
+        }
+    }
+}
+
 absolved_trainings_schema = {
     "tags": [
         "absolved-trainings"
@@ -518,3 +557,212 @@ cm_quiz_hook_schema = {
         }
     }
 }
+
+fabman_event = {
+    "id": 2278519,
+    "type": "member_updated",
+    "createdAt": "2024-10-07T18:11:02.420Z",
+    "details": {
+        "member": {
+            "id": 1
+        }
+    }
+}
+
+activities_schema = {
+    "tags": [
+        "fabman-webhook"
+    ],
+    "parameters": [
+        {
+            "name": "token",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "FABMAN_WEBHOOK_TOKEN (alternatively in Authorization header)"
+        },
+        {
+            "name": "body",
+            "in": "body",
+            "type": "object",
+            "required": True,
+            "schema": {
+                "$ref": "#/definitions/FabmanEvent"
+            }
+        }
+    ],
+    "consumes": [
+        TYPE_JSON
+    ],
+    "definitions": {
+        "FabmanEvent": {
+            "type": "object",
+            "properties": {
+                "id": {
+                    "type": "integer"
+                },
+                "type": {
+                    "type": "string"
+                },
+                "createdAt": {
+                    "type": "string"
+                },
+                "details": {
+                    "type": "object"
+                }
+            },
+            "example": fabman_event
+        }
+    },
+    "deprecated": False,
+    "responses": {
+        "200": {
+            "description": "Success message",
+            "schema": {
+                "type": "string",
+                "example": "Member synced"
+            }
+        }
+    }
+}
+
+metrics_schema = {
+    "tags": [
+        "metrics"
+    ],
+    "security": [
+        {
+            "cronjob_token": []
+        }
+    ],
+    "produces": [
+        TYPE_JSON
+    ],
+    "deprecated": False,
+    "responses": {
+        "200": {
+            "description": "Counters, gauges and timings of current worker process",
+            "schema": {
+                "type": "object",
+                "example": {
+                    "counters": {
+                        "replica.member.hit": 42
+                    },
+                    "gauges": {
+                        "replica.members": 420
+                    },
+                    "timings": {
+                        "replica.sync_duration": {
+                            "count": 1,
+                            "sum": 2.5,
+                            "max": 2.5
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+member_dashboard_schema = {
+    "tags": [
+        "member-dashboard"
+    ],
+    "parameters": [
+        {
+            "name": "member_id",
+            "in": "path",
+            "type": "integer",
+            "required": True
+        },
+        {
+            "name": "links",
+            "in": "query",
+            "type": "boolean",
+            "required": False,
+            "description": "Add link details (quiz, wiki and youtube URL) of available trainings"
+        }
+    ],
+    "produces": [
+        TYPE_JSON
+    ],
+    "deprecated": False,
+    "responses": {
+        "200": {
+            "description": "Absolved and available trainings of member (same items as /absolved_trainings and "
+                           "/available_trainings)",
+            "schema": {
+                "type": "object",
+                "example": {
+                    "absolved": [
+                        {
+                            "id": 1,
+                            "title": "Course 1",
+                            "date": "2024-01-01"
+                        }
+                    ],
+                    "available": [
+                        {
+                            "id": 2,
+                            "title": "Course 2",
+                            "quiz_url": "url-to-ClassMarker-quiz"
+                        }
+                    ],
+                    "links": [
+                        {
+                            "id": 2,
+                            "en_name": "Course 2",
+                            "cs_name": "Kurz 2",
+                            "quiz_url": "url-to-ClassMarker-quiz",
+                            "yt_url": "url-to-youtube-video",
+                            "wiki_url": "url-to-wiki-article"
+                        }
+                    ]
+                }
+            }
+        }
+    }
+}
+
+available_trainings_batch_schema = {
+    "tags": [
+        "available-trainings"
+    ],
+    "parameters": [
+        {
+            "name": "body",
+            "in": "body",
+            "type": "object",
+            "required": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "member_ids": {
+                        "type": "array",
+                        "items": {
+                            "type": "integer"
+                        }
+                    }
+                },
+                "example": {
+                    "member_ids": [123456, 234567]
+                }
+            }
+        }
+    ],
+    "produces": [
+        "application/x-ndjson"
+    ],
+    "deprecated": False,
+    "responses": {
+        "200": {
+            "description": "One JSON row per member (in order of completion) with available trainings (same items as "
+                           "/available_trainings) or error",
+            "schema": {
+                "type": "string",
+                "example": '{"member_id": 123456, "trainings": [{"id": 1, "title": "Course 1"}]}\n'
+                           '{"member_id": 234567, "error": "CustomError: Error during data fetching"}\n'
+            }
+        }
+    }
+}
@@ -0,0 +1,155 @@
+import time
+from threading import Condition
+from typing import Dict, Union
+
+from flask import Flask, Response, g, request
+
+from application.configs.config import ADMISSION_WEBHOOK_LIMIT, ADMISSION_WEBHOOK_QUEUE, ADMISSION_READS_LIMIT,\
+    ADMISSION_READS_QUEUE, ADMISSION_EXPIRATION_LIMIT, ADMISSION_EXPIRATION_QUEUE, ADMISSION_QUEUE_TIMEOUT,\
+    ADMISSION_RETRY_AFTER
+from application.services.deadline import remaining
+from application.services.metrics import metrics
+
+
+# admission class of route, routes without class (healthcheck, metrics, docs) are never limited
+ROUTE_CLASSES: Dict[str, str] = {
+    "main.add_classmarker_training": "webhook",
+    "main.activities_notifications": "webhook",
+    "main.get_list_of_absolved_trainings": "reads",
+    "main.get_list_of_available_trainings": "reads",
+    "main.get_available_trainings_batch": "reads",
+    "main.get_member_dashboard": "reads",
+    "main.get_training_links": "reads",
+    "main.training_expiration": "expiration",
+    "main.member_changed": "expiration"
+}
+
+
+class AdmissionLimit:
+    """
+    Concurrency limit of one admission class with bounded wait queue. Requests over the limit wait in queue (at most
+    queue_timeout seconds), requests which don't fit into the queue are rejected immediately.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = Condition()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Take a slot of the class, wait in queue if all slots are taken.
+        :param timeout: max seconds of waiting, shorter of queue_timeout and timeout is used
+        :return: slot was taken (False - request has to be rejected)
+        """
+
+        if not self.limit:
+            return True
+
+        timeout = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+
+        with self._condition:
+            if self.active < self.limit:
+                self._take()
+
+                return True
+
+            if self.waiting >= self.queue_size or timeout <= 0:
+                metrics.incr(f'admission.{self.name}.rejected')
+
+                return False
+
+            self.waiting += 1
+            metrics.incr(f'admission.{self.name}.queued')
+            start = time.perf_counter()
+
+            try:
+                admitted = self._condition.wait_for(lambda: self.active < self.limit, timeout)
+
+            finally:
+                self.waiting -= 1
+                metrics.observe(f'admission.{self.name}.queue_wait', round(time.perf_counter() - start, 3))
+
+            if not admitted:
+                metrics.incr(f'admission.{self.name}.rejected')
+
+                return False
+
+            self._take()
+
+            return True
+
+    def _take(self) -> None:
+        self.active += 1
+        metrics.set(f'admission.{self.name}.active', self.active)
+
+    def release(self) -> None:
+        if not self.limit:
+            return
+
+        with self._condition:
+            self.active -= 1
+            metrics.set(f'admission.{self.name}.active', self.active)
+            self._condition.notify()
+
+
+limits: Dict[str, AdmissionLimit] = {
+    "webhook": AdmissionLimit("webhook", ADMISSION_WEBHOOK_LIMIT, ADMISSION_WEBHOOK_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+    "reads": AdmissionLimit("reads", ADMISSION_READS_LIMIT, ADMISSION_READS_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+    "expiration": AdmissionLimit(
+        "expiration", ADMISSION_EXPIRATION_LIMIT, ADMISSION_EXPIRATION_QUEUE, ADMISSION_QUEUE_TIMEOUT
+    )
+}
+
+
+def init_app(app: Flask) -> None:
+    app.before_request(admit_request)
+    app.after_request(release_after_stream)
+    app.teardown_request(release_request)
+
+
+def admit_request() -> Union[Response, None]:
+    """
+    Admit request by limit of its route class, reject it with 503 and Retry-After when the class is overloaded.
+    Waiting in queue is bounded by deadline of the request.
+    """
+
+    name = ROUTE_CLASSES.get(request.endpoint)
+
+    if not name:
+        return None
+
+    if not limits[name].acquire(remaining()):
+        return Response(
+            "Service is overloaded, retry later",
+            503,
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+        )
+
+    g.admission_class = name
+
+    return None
+
+
+def release_after_stream(response: Response) -> Response:
+    """
+    Keep slot of streamed response (e.g. NDJSON batch) until the stream is finished or closed by client, teardown of
+    request runs before the stream is generated.
+    """
+
+    if response.is_streamed and "admission_class" in g:
+        limit = limits[g.pop("admission_class")]
+        response.call_on_close(limit.release)
+
+    return response
+
+
+def release_request(exc: BaseException = None) -> None:
+    name = g.pop("admission_class", None)
+
+    if name:
+        limits[name].release()
@@ -1,19 +1,36 @@
-import requests
-from flask import session, Request, Response, render_template, jsonify
+from flask import session, Request, Response, jsonify, has_request_context, has_app_context, g
 import hmac
 import hashlib
 import base64
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from cryptography.fernet import Fernet
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
 
-from typing import Dict, List, Union, Tuple
+from typing import Any, Callable, Dict, List, Union, Tuple
 from application.services.tools import get_current_training_with_index, get_member_training, expired_date
 from application.configs.config import CLASSMARKER_WEBHOOK_SECRET, FABMAN_API_KEY, MAX_COURSE_ATTEMPTS, FERNET_KEY,\
-    CRONJOB_TOKEN, MAIL_USERNAME, VERIFY_CLASSMARKER_REQUESTS, COURSES_WEB_PRIVATE_KEY
+    CRONJOB_TOKEN, VERIFY_CLASSMARKER_REQUESTS, COURSES_WEB_PRIVATE_KEY, FABMAN_WEBHOOK_TOKEN,\
+    READ_REPLICA_RECONCILE_INTERVAL, FABMAN_API_URL, MEMBER_UPDATE_RETRIES, BATCH_MAX_MEMBERS, BATCH_MAX_WORKERS
 from ..services.error_handlers import CustomError
-from ..services.extensions import mail, Message
-from application.services.tools import decrypt_identifiers
+from ..services.emails import emails
+from application.services.tools import decrypt_identifiers, conditional_etag
+from application.services.catalog import get_catalog_projection, project_course, course_version, CatalogProjection
+from application.services.replica import replica
+from application.services.cache import cache
+from application.services.metrics import metrics
+from application.services.fabman import fabman_request, last_known_good, FabmanUnavailable
+from application.services.member_lock import member_locks
+from application.services.serialization import dumps, loads
+from application.services import identity_map
+from application.services.expiration import ExpirationEngine
+
+
+REPLICA_SYNC_PAGE_SIZE = 500
+
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="batch")
 
 
 def verify_payload(payload, header_hmac_signature):
@@ -46,16 +63,14 @@ def add_training_to_member(member_id: int, training_id: int) -> None:
         "notes": "Training absolved by Classmarker course"
     }
 
-    res = requests.post(
-        f'https://fabman.io/api/v1/members/{member_id}/trainings',
-        data=new_training_data,
-        headers={"Authorization": f'{FABMAN_API_KEY}'}
-    )
+    res = fabman_request("POST", f'{FABMAN_API_URL}/members/{member_id}/trainings', data=new_training_data)
 
     if res.status_code != 201:
         raise CustomError(f'Error during passed training posting - {res.text}. '
                           f'Member ID: {member_id}, data: {new_training_data}')
 
+    member_changed(member_id)
+
 
 def parse_failed_courses_data(member_metadata: Dict[str, List[Dict[str, str | int]]], training_id: int,
                               count_attempts: bool = False, token: str = None) -> List[Dict[str, str | int]]:
@@ -80,7 +95,7 @@ def parse_failed_courses_data(member_metadata: Dict[str, List[Dict[str, str | in
         raise CustomError("Ran out of attempts")
 
     if not current_course_with_index:
-        failed_training = data_from_get_request(f'https://fabman.io/api/v1/training-courses/{training_id}/', token)
+        failed_training = data_from_get_request(f'{FABMAN_API_URL}/training-courses/{training_id}/', token)
         failed_courses_list.append({"id": training_id, "title": failed_training.get("title"), "attempts": 1})
 
     else:
@@ -91,6 +106,49 @@ def parse_failed_courses_data(member_metadata: Dict[str, List[Dict[str, str | in
     return failed_courses_list
 
 
+def update_member_metadata(member_id: int, member_data: Dict, update: Callable[[Dict], Union[Dict, None]],
+                           error_message: str) -> Union[Dict, None]:
+    """
+    Save member's metadata changed by update function. When Fabman rejects the update because of changed lockVersion,
+    member data are fetched again and update is applied to them (max MEMBER_UPDATE_RETRIES times).
+    :param member_id: ID of current user from Fabman DB
+    :param member_data: current member data (with lockVersion and metadata)
+    :param update: function returning new metadata for member data, None if nothing should be changed
+    :param error_message: description of failed update for raised error
+    :raises error_message: request failed
+    :return: saved metadata or None if nothing was changed
+    """
+
+    for attempt in range(MEMBER_UPDATE_RETRIES + 1):
+        member_metadata = update(member_data)
+
+        if member_metadata is None:
+            return None
+
+        new_member_data = {
+            "lockVersion": member_data["lockVersion"],
+            "metadata": member_metadata
+        }
+
+        res = fabman_request("PUT", f'{FABMAN_API_URL}/members/{member_id}', json=new_member_data)
+
+        if res.status_code == 200:
+            member_changed(member_id)
+
+            return member_metadata
+
+        if res.status_code != 409 or attempt == MEMBER_UPDATE_RETRIES:
+            if res.status_code == 409:
+                metrics.incr("member_update.conflict_failed")
+
+            raise CustomError(f'{error_message} - {res.text}. Member ID: {member_id}, data: {new_member_data}')
+
+        metrics.incr("member_update.conflict")
+        member_changed(member_id)
+        member_data = data_from_get_request(f'{FABMAN_API_URL}/members/{member_id}', FABMAN_API_KEY)
+        metrics.incr("member_update.retry")
+
+
 def process_failed_attempt(member_id: int, training_id: int, count_attempts: bool = False, token: str = None,
                            member_data: Dict = None, return_attempts: bool = False) -> Union[int, None]:
     """
@@ -106,28 +164,22 @@ def process_failed_attempt(member_id: int, training_id: int, count_attempts: boo
     """
 
     if not member_data:
-        member_data = data_from_get_request(f'https://fabman.io/api/v1/members/{member_id}/', token)
+        member_data = data_from_get_request(f'{FABMAN_API_URL}/members/{member_id}/', token)
 
-    member_metadata = member_data.get("metadata") or {"courses_cm": {}}
-    member_metadata["courses_cm"] = member_metadata.get("courses_cm") or {}
-    member_metadata["courses_cm"]["failed_courses"] = parse_failed_courses_data(member_metadata, training_id,
-                                                                                count_attempts, token=token)
+    def updated_metadata(data: Dict) -> Dict:
+        member_metadata = data.get("metadata") or {"courses_cm": {}}
+        member_metadata["courses_cm"] = member_metadata.get("courses_cm") or {}
+        member_metadata["courses_cm"]["failed_courses"] = parse_failed_courses_data(member_metadata, training_id,
+                                                                                    count_attempts, token=token)
 
-    if count_attempts:
-        new_member_data = {
-            "lockVersion": member_data["lockVersion"],
-            "metadata": member_metadata
-        }
+        return member_metadata
 
-        res = requests.put(
-            f'https://fabman.io/api/v1/members/{member_id}',
-            json=new_member_data,
-            headers={"Authorization": f'{FABMAN_API_KEY}'}
-        )
+    if count_attempts:
+        member_metadata = update_member_metadata(member_id, member_data, updated_metadata,
+                                                 "Error during failed training saving")
 
-        if res.status_code != 200:
-            raise CustomError(f'Error during failed training saving - {res.text}. '
-                              f'Member ID: {member_id}, data: {new_member_data}')
+    else:
+        member_metadata = updated_metadata(member_data)
 
     if return_attempts:
         updated_fail = next(
@@ -146,58 +198,280 @@ def remove_failed_training_from_user(member_data: Dict, member_id: int, training
     :return: None
     """
 
-    member_metadata = member_data["metadata"] or {}
-    courses_cm = member_metadata.get("courses_cm") or {"failed_courses": []}
-    failed_courses_list = courses_cm.get("failed_courses")
+    def updated_metadata(data: Dict) -> Union[Dict, None]:
+        member_metadata = data["metadata"] or {}
+        courses_cm = member_metadata.get("courses_cm") or {"failed_courses": []}
+        failed_courses_list = courses_cm.get("failed_courses")
+
+        if not failed_courses_list or not any((f for f in failed_courses_list if f["id"] == training_id)):
+            return None
 
-    if failed_courses_list and any((f for f in failed_courses_list if f["id"] == training_id)):
         current_course_with_index = get_current_training_with_index(failed_courses_list, training_id)
 
-        if current_course_with_index:
-            try:
-                del failed_courses_list[current_course_with_index[0]]
+        if not current_course_with_index:
+            return None
 
-            except IndexError:
-                pass
+        try:
+            del failed_courses_list[current_course_with_index[0]]
 
-            new_member_data = {
-                "lockVersion": member_data["lockVersion"],
-                "metadata": member_metadata
-            }
+        except IndexError:
+            pass
 
-            res = requests.put(
-                f'https://fabman.io/api/v1/members/{member_id}',
-                json=new_member_data,
-                headers={"Authorization": f'{FABMAN_API_KEY}'}
-            )
+        return member_metadata
 
-            if res.status_code != 200:
-                raise CustomError(f'Error during failed training removing from metadata - {res.text}. '
-                                  f'Member ID: {member_id}, data: {new_member_data}')
+    update_member_metadata(member_id, member_data, updated_metadata,
+                           "Error during failed training removing from metadata")
 
 
 def data_from_get_request(url: str, token: str) -> Union[List, Dict]:
     """
-    Function for GET requests with auth header, returning fetched data.
+    Function for GET requests with auth header, returning fetched data. Resource is fetched only once per request
+    (until it's changed by bridge). Every call returns new copy (identity map and last known good data keep raw
+    response), so callers can modify it.
     :param url: API URL
     :param token: Fabman API token with admin permissions
     :raises Error during data fetching: request failed
+    :raises FabmanUnavailable: Fabman is down, too slow or the circuit breaker is open
     :return: data from GET request
     """
+    data = identity_map.get(url)
+
+    if data is not None:
+        return data
+
     start = datetime.now().timestamp()
-    res = requests.get(url, headers={"Authorization": f'{token}'})
+    res = fabman_request("GET", url, token)
 
     if res.status_code != 200:
         raise CustomError("Error during data fetching", f'{url}, {res.text}')
 
-    data = res.json()
-    request_name = url.replace("https://fabman.io/api/v1", "").split("?")[0]
+    data = loads(res.content)
+    identity_map.put(url, res.content)
+    request_name = url.replace(FABMAN_API_URL, "").split("?")[0]
+
+    if has_request_context():
+        session.setdefault(f'fabman: {request_name}', round(datetime.now().timestamp() - start, 3))
+
+    if token == FABMAN_API_KEY:
+        last_known_good.put(url, res.content)
+
+    return data
+
+
+def stale_data(url: str, token: str, error: FabmanUnavailable, replica_fallback: Callable[[], Any] = None) -> Any:
+    """
+    Last known good data of Fabman resource for read endpoints, response of current request is marked as stale.
+    :param url: API URL
+    :param token: Fabman API token with admin permissions
+    :param error: error of failed Fabman request
+    :param replica_fallback: function returning stale data from read replica (or None)
+    :raises FabmanUnavailable: there are no data to fall back to
+    :return: data of the last successful GET request
+    """
+
+    data = None
+
+    if token == FABMAN_API_KEY:
+        entry = last_known_good.get(url)
+        data = loads(entry[0]) if entry else None
+
+        if data is None and replica_fallback and replica.enabled:
+            data = replica_fallback()
+
+    if data is None:
+        metrics.incr("fabman.stale_fallback_missing")
+
+        raise error
 
-    session.setdefault(f'fabman: {request_name}', round(datetime.now().timestamp() - start, 3))
+    metrics.incr("fabman.stale_fallback")
+
+    if has_app_context():
+        g.stale_data = True
 
     return data
 
 
+def cached_get_request(url: str, token: str, replica_fallback: Callable[[], Any] = None) -> Union[List, Dict]:
+    """
+    GET request served from cache (stale-while-revalidate), only requests with bridge's own Fabman token are cached.
+    Last known good data are returned when Fabman is unavailable.
+    :param url: API URL
+    :param token: Fabman API token with admin permissions
+    :param replica_fallback: function returning stale data from read replica, used when Fabman is unavailable
+    :return: data from GET request, must not be modified by caller
+    """
+
+    try:
+        if token != FABMAN_API_KEY:
+            return data_from_get_request(url, token)
+
+        return cache.get(url, lambda: data_from_get_request(url, token))
+
+    except FabmanUnavailable as e:
+        return stale_data(url, token, e, replica_fallback)
+
+
+def replicated_member(member_id: int | str, token: str) -> Union[Dict, None]:
+    """
+    Get member data from read replica, if replica is enabled and request is authorized by bridge's own Fabman token.
+    :param member_id: ID of member in Fabman DB
+    :param token: Fabman API token with admin permissions
+    :return: member data with embedded trainings and privileges or None
+    """
+
+    if not replica.enabled or token != FABMAN_API_KEY:
+        return None
+
+    return replica.get_member(member_id)
+
+
+def fetch_member(member_id: int | str, token: str) -> Dict:
+    """
+    Get member data with embedded trainings and privileges for read endpoints (read replica first, then Fabman,
+    last known good data when Fabman is unavailable).
+    :param member_id: ID of member in Fabman DB
+    :param token: Fabman API token with admin permissions
+    :return: member data
+    """
+
+    member_data = replicated_member(member_id, token)
+
+    if member_data:
+        return member_data
+
+    url = f'{FABMAN_API_URL}/members/{member_id}?embed=trainings&embed=privileges'
+
+    try:
+        member_data = data_from_get_request(url, token)
+
+    except FabmanUnavailable as e:
+        return stale_data(url, token, e, lambda: replica.get_member(member_id, allow_stale=True))
+
+    if replica.enabled and token == FABMAN_API_KEY:
+        replica.put_member(member_data)
+
+    return member_data
+
+
+def fetch_training_courses(for_members: bool, token: str) -> List[Dict]:
+    """
+    Get training-courses catalog for read endpoints (read replica first, then Fabman).
+    :param for_members: True for catalog available for members, False for admins catalog
+    :param token: Fabman API token with admin permissions
+    :return: list of training-courses
+    """
+
+    if replica.enabled and token == FABMAN_API_KEY:
+        trainings = replica.get_training_courses(for_members)
+
+        if trainings is not None:
+            return trainings
+
+    trainings_url = f'{FABMAN_API_URL}/training-courses'
+
+    if for_members:
+        trainings_url += "?q=for_members"
+
+    return cached_get_request(trainings_url, token, lambda: replica.get_training_courses(for_members, allow_stale=True))
+
+
+def fetch_training_course(training_id: int | str, token: str) -> Dict:
+    """
+    Get training-course for read endpoints (read replica first, then Fabman).
+    :param training_id: ID of training-course in Fabman DB
+    :param token: Fabman API token with admin permissions
+    :return: training-course data
+    """
+
+    if replica.enabled and token == FABMAN_API_KEY:
+        training = replica.get_training_course(training_id)
+
+        if training:
+            return training
+
+    return cached_get_request(
+        f'{FABMAN_API_URL}/training-courses/{training_id}',
+        token,
+        lambda: replica.get_training_course(training_id, allow_stale=True)
+    )
+
+
+def warm_up_cache() -> None:
+    """
+    Fetch both variants of training-courses catalog (for members and for admins) into cache.
+    """
+
+    for for_members in (True, False):
+        fetch_training_courses(for_members, FABMAN_API_KEY)
+
+
+def member_changed(member_id: int | str) -> None:
+    """
+    Invalidate all local copies of member data after bridge changed it in Fabman.
+    :param member_id: ID of member in Fabman DB
+    :return: None
+    """
+
+    cache.invalidate_resource(f'{FABMAN_API_URL}/members/{member_id}')
+    identity_map.invalidate(f'{FABMAN_API_URL}/members/{member_id}')
+
+    if replica.enabled:
+        replica.delete_member(member_id)
+
+
+def sync_training_courses(synced_at: float = None) -> None:
+    """
+    Copy training-courses catalog (admins and members variant) from Fabman to read replica.
+    """
+
+    synced_at = synced_at or time.time()
+    courses = data_from_get_request(f'{FABMAN_API_URL}/training-courses', FABMAN_API_KEY)
+    for_members = data_from_get_request(f'{FABMAN_API_URL}/training-courses?q=for_members', FABMAN_API_KEY)
+    replica.put_training_courses(courses, {c["id"] for c in for_members}, synced_at)
+
+
+def sync_replica() -> None:
+    """
+    Bulk sync of training-courses catalog and all members (with trainings and privileges) to read replica.
+    """
+
+    start = time.time()
+    sync_training_courses(start)
+
+    members = []
+    offset = 0
+
+    while True:
+        page = data_from_get_request(
+            f'{FABMAN_API_URL}/members?embed=trainings&embed=privileges'
+            f'&limit={REPLICA_SYNC_PAGE_SIZE}&offset={offset}',
+            FABMAN_API_KEY
+        )
+        members.extend(page)
+
+        if len(page) < REPLICA_SYNC_PAGE_SIZE:
+            break
+
+        offset += REPLICA_SYNC_PAGE_SIZE
+
+    replica.put_members(members, start)
+    replica.delete_members_synced_before(start)
+
+    metrics.incr("replica.sync")
+    metrics.set("replica.members", len(members))
+    metrics.observe("replica.sync_duration", round(time.time() - start, 3))
+    print(f'Read replica synced, {len(members)} members')
+
+
+def reconcile_replica() -> None:
+    """
+    Periodic reconciliation of read replica, only one worker process runs it per interval.
+    """
+
+    if replica.claim("reconcile", READ_REPLICA_RECONCILE_INTERVAL * 0.9):
+        sync_replica()
+
+
 def check_members_training(training_id: int, trainings: List[Dict]) -> str:
     """
     Find current training in members data, if exists.
@@ -253,11 +527,25 @@ def create_cm_link(member_id: int | str, training_id: int | str, training_list:
     courses_cm = metadata.get("courses_cm") or {}
     base_url = courses_cm.get("cm_url") or ""
 
-    f = Fernet(FERNET_KEY.encode("ascii", "ignore"))
-    id_string = f'{member_id}-{training_id}'
-    token = f.encrypt(id_string.encode("ascii", "ignore"))
+    return create_quiz_url(Fernet(FERNET_KEY.encode("ascii", "ignore")), member_id, training_id, base_url)
+
+
+def create_quiz_url(f: Fernet, member_id: int | str, training_id: int | str, base_url: str) -> str:
+    """
+    Append encrypted member and training IDs to Classmarker quiz URL.
+    :param f: Fernet instance, could be shared for all links of one request
+    :param member_id: ID of user in Fabman DB (/members/ API)
+    :param training_id: ID of training-course in Fabman DB (/training-courses/ API)
+    :param base_url: URL of Classmarker quiz from training-course metadata
+    :return: full URL of Classmarker quiz or empty string if base URL is missing
+    """
+
+    if not base_url:
+        return base_url
 
-    return f'{base_url}&cm_user_id={token.decode()}' if base_url else base_url
+    token = f.encrypt(f'{member_id}-{training_id}'.encode("ascii", "ignore"))
+
+    return f'{base_url}&cm_user_id={token.decode()}'
 
 
 def get_active_user_trainings_and_user_data(member_id: str, token: str) -> Tuple[List[Dict], Dict]:
@@ -265,24 +553,18 @@ def get_active_user_trainings_and_user_data(member_id: str, token: str) -> Tuple
     Get filtered trainings of specific user without expired trainings.
     :param member_id: ID of specific member in Fabman DB
     :param token: Fabman API token with admin permissions
-    :return: list of trainings of user before expiration date
+    :return: list of trainings of user before expiration date (with embedded training-course) and user data
     """
-    data = data_from_get_request(
-        f'https://fabman.io/api/v1/members/{member_id}?embed=trainings&embed=privileges',
-        token
-    )
-
-    trainings = data["_embedded"]["trainings"]
+    data = fetch_member(member_id, token)
+    active_trainings, _ = ExpirationEngine().split(data["_embedded"]["trainings"])
 
     return (
         [
             {
                 "id": t["trainingCourse"],
-                "title": t["_embedded"]["trainingCourse"]["title"],
                 "date": t["date"],
-                "notes": t["_embedded"]["trainingCourse"]["notes"],
-                "metadata": t["_embedded"]["trainingCourse"]["metadata"]
-            } for t in trainings if (not expired_date(t["untilDate"]) if t["untilDate"] else True)
+                "course": t["_embedded"]["trainingCourse"]
+            } for t in active_trainings
         ],
         {
             "metadata": data["metadata"],
@@ -303,7 +585,7 @@ def get_training_links(request_data: Dict, token: str) -> Dict:
     if not member_id or not training_id:
         raise ValueError("Missing member_id or training_id")
 
-    training = data_from_get_request(f'https://fabman.io/api/v1/training-courses/{training_id}', token)
+    training = fetch_training_course(training_id, token)
 
     if not training:
         raise CustomError("Training is disabled for web")
@@ -312,7 +594,8 @@ def get_training_links(request_data: Dict, token: str) -> Dict:
         member_id,
         training_id,
         [training],
-        token
+        token,
+        member_data=replicated_member(member_id, token)
     )
 
     courses_cm = training["metadata"].get("courses_cm") or {}
@@ -371,25 +654,37 @@ def add_classmarker_training_fn(request: Request) -> Response:
     member_id = int(identifiers.split("-")[0])
     training_id = int(identifiers.split("-")[1])
 
+    with member_locks.lock(member_id):
+        return process_classmarker_result(member_id, training_id, request_data["result"]["passed"])
+
+
+def process_classmarker_result(member_id: int, training_id: int, passed: bool) -> Response:
+    """
+    Save result of Classmarker quiz to member in Fabman and notify member, caller must hold lock of the member.
+    :param member_id: ID of current user from Fabman DB
+    :param training_id: ID of current training from Fabman DB
+    :param passed: member passed the quiz
+    :return: Response
+    """
+
     member_data = data_from_get_request(
-        f'https://fabman.io/api/v1/members/{member_id}?embed=trainings',
+        f'{FABMAN_API_URL}/members/{member_id}?embed=trainings',
         FABMAN_API_KEY
     )
 
     training = data_from_get_request(
-        f'https://fabman.io/api/v1/training-courses/{training_id}',
+        f'{FABMAN_API_URL}/training-courses/{training_id}',
         FABMAN_API_KEY
     )
 
     attempts = process_failed_attempt(member_id, training_id, True, member_data=member_data,
                                       return_attempts=True, token=FABMAN_API_KEY)
 
-    if not request_data["result"]["passed"]:
+    if not passed:
         # <<<---------------------- EMAIL: FAILED TRAINING, X ATTEMPTS LEFT---------------------->>>
         template = "failed_attempt.html" if attempts < MAX_COURSE_ATTEMPTS else "out_of_attempts.html"
-        msg = Message("FabLab info - test failed", sender=MAIL_USERNAME, recipients=[member_data["emailAddress"]])
-        msg.html = render_template(template, training_title=training["title"])
-        mail.send(msg)
+        emails.send("FabLab info - test failed", [member_data["emailAddress"]], template,
+                    training_title=training["title"])
 
         return Response("Failed attempt saved in Fabman", 200)
 
@@ -401,72 +696,68 @@ def add_classmarker_training_fn(request: Request) -> Response:
     add_training_to_member(member_id, training_id)
 
     member_data = data_from_get_request(
-        f'https://fabman.io/api/v1/members/{member_id}?embed=trainings',
+        f'{FABMAN_API_URL}/members/{member_id}?embed=trainings',
         FABMAN_API_KEY
     )
 
     remove_failed_training_from_user(member_data, member_id, training_id)
 
     if expired_training_id:
-        res = requests.delete(
-            f'https://fabman.io/api/v1/members/{member_id}/trainings/{expired_training_id}',
-            headers={"Authorization": f'{FABMAN_API_KEY}'}
-        )
+        res = fabman_request("DELETE", f'{FABMAN_API_URL}/members/{member_id}/trainings/{expired_training_id}')
 
         if res.status_code != 204:
             raise CustomError(f'Error during old training removing - {res.text}. '
                               f'Member ID: {member_id}, training ID: {expired_training_id}')
 
+        member_changed(member_id)
+
     print(f'User ID {member_id} absolved training ID {training_id}')
 
     # <<<---------------------- EMAIL: TRAINING PASSED ---------------------->>>
-    msg = Message("FabLab info - test passed", sender=MAIL_USERNAME, recipients=[member_data["emailAddress"]])
-    msg.html = render_template("succeed_attempt.html", training_title=training["title"])
-    mail.send(msg)
+    emails.send("FabLab info - test passed", [member_data["emailAddress"]], "succeed_attempt.html",
+                training_title=training["title"])
 
     return Response("Training passed, updated in Fabman", 200)
 
 
-def get_list_of_available_trainings_fn(member_id: str) -> List[dict]:
-    token = os.environ['FABMAN_API_KEY']
-    user_active_trainings, user_data = get_active_user_trainings_and_user_data(member_id, token)
-
-    trainings_url = "https://fabman.io/api/v1/training-courses"
-
-    if user_data.get("privileges") != "admin":
-        trainings_url += "?q=for_members"
-
-    trainings = data_from_get_request(trainings_url, token)
-
-    trainings_data = [{k: t[k] for k in ["id", "title", "metadata", "notes"]} for t in trainings]
-    user_active_trainings_ids = [at["id"] for at in user_active_trainings]
-
-    available_trainings_for_member = [t for t in trainings_data if t["id"] not in user_active_trainings_ids]
-    for_render = []
-
-    for t in available_trainings_for_member:
-        t["quiz_url"] = create_cm_link(
-            member_id,
-            t["id"],
-            available_trainings_for_member,
-            token,
-            member_data={"metadata": user_data["metadata"] or {}}
-        )
-
-        course_metadata = (t.get("metadata") or {}).get("courses_cm") or {}
+def available_trainings(member_id: str, catalog: CatalogProjection, active_trainings_ids: set) -> List[Dict]:
+    """
+    Build list of trainings available for member (not absolved courses of catalog).
+    :param member_id: ID of member in Fabman DB
+    :param catalog: projection of training-courses catalog
+    :param active_trainings_ids: IDs of member's active (absolved and not expired) training-courses
+    :return: list of available trainings
+    """
 
-        t["yt_url"] = course_metadata.get("yt_url") or ""
-        t["for_web"] = bool(t["notes"] and "for_web" in t["notes"])
-        t["for_offline"] = bool(t["notes"] and "for_offline" in t["notes"])
+    f = Fernet(FERNET_KEY.encode("ascii", "ignore"))
 
-        t["cs_name"] = course_metadata.get("cs_name") or t["title"]
-        t["en_name"] = course_metadata.get("en_name") or t["title"]
+    return [
+        {
+            "id": c["id"],
+            "title": c["title"],
+            "notes": c["notes"],
+            "quiz_url": create_quiz_url(f, member_id, c["id"], c["cm_url"]),
+            "yt_url": c["yt_url"],
+            "for_web": c["for_web"],
+            "for_offline": c["for_offline"],
+            "cs_name": c["cs_name"],
+            "en_name": c["en_name"]
+        } for c in catalog.courses if c["id"] not in active_trainings_ids
+    ]
+
+
+def get_list_of_available_trainings_fn(member_id: str) -> List[dict] | Response:
+    token = os.environ['FABMAN_API_KEY']
+    user_active_trainings, user_data = get_active_user_trainings_and_user_data(member_id, token)
 
-        del t["metadata"]
+    catalog = get_catalog_projection(fetch_training_courses(user_data.get("privileges") != "admin", token))
+    user_active_trainings_ids = {at["id"] for at in user_active_trainings}
 
-        for_render.append(t)
+    if conditional_etag("available", member_id, user_data["lockVersion"], sorted(user_active_trainings_ids),
+                        catalog.version):
+        return Response(status=304)
 
-    return for_render
+    return available_trainings(member_id, catalog, user_active_trainings_ids)
 
 
 def training_expiration_fn(request: Request) -> Response:
@@ -475,9 +766,10 @@ def training_expiration_fn(request: Request) -> Response:
     """
     request_data = request.json
     member_id = request_data.get("member_id")
+    training_id = request_data.get("training_id")
 
-    if not member_id:
-        raise ValueError("Missing member_id")
+    if not member_id or not training_id:
+        raise ValueError("Missing member_id or training_id")
 
     if request.headers.get("CronjobToken") != CRONJOB_TOKEN:
         raise CustomError("Unauthorized access")
@@ -485,43 +777,178 @@ def training_expiration_fn(request: Request) -> Response:
     public_key = hashlib.sha512(f'{member_id}{COURSES_WEB_PRIVATE_KEY}'.encode()).hexdigest()
     url = f'https://skoleni.fablabbrno.cz?id={member_id}&key={public_key}'
 
-    member_data = data_from_get_request(f'https://fabman.io/api/v1/members/{member_id}', FABMAN_API_KEY)
-    training_data = get_training_links(request_data, FABMAN_API_KEY)
+    member_data = data_from_get_request(f'{FABMAN_API_URL}/members/{member_id}', FABMAN_API_KEY)
+    training = fetch_training_course(training_id, FABMAN_API_KEY)
 
     # <<<---------------------- EMAIL: TRAINING EXPIRATION ---------------------->>>
-    msg = Message("FabLab info - training expiration", sender=MAIL_USERNAME, recipients=[member_data["emailAddress"]])
-    msg.html = render_template(
+    emails.send(
+        "FabLab info - training expiration",
+        [member_data["emailAddress"]],
         "training_expiration.html",
-        training_title=training_data.get("title"),
-        training_url=url
+        recipient_context={"training_url": url},
+        training_title=training["title"]
     )
-    mail.send(msg)
 
     return Response("", 200)
 
 
+def member_changed_fn(request: Request) -> Response:
+    """
+    Invalidate local copies of member data (read replica, cache) after scheduler changed member in Fabman.
+    """
+    member_id = (request.json or {}).get("member_id")
+
+    if request.headers.get("CronjobToken") != CRONJOB_TOKEN:
+        raise CustomError("Unauthorized access")
+
+    if not member_id:
+        raise ValueError("Missing member_id")
+
+    member_changed(member_id)
+
+    return Response("", 200)
+
+
+def absolved_trainings(trainings: List[Dict]) -> List[Dict]:
+    """
+    Build list of member's absolved trainings.
+    :param trainings: active trainings of member (with embedded training-course)
+    :return: list of absolved trainings
+    """
+
+    res = []
+
+    for t in trainings:
+        c = project_course(t["course"])
+
+        res.append({
+            "id": t["id"],
+            "title": c["title"],
+            "date": t["date"],
+            "yt_url": c["yt_url"],
+            "for_web": c["for_web"],
+            "for_offline": c["for_offline"],
+            "cs_name": c["cs_name"],
+            "en_name": c["en_name"]
+        })
+
+    return res
+
+
 def get_list_of_absolved_trainings_fn(member_id: str) -> List[dict]:
     token = os.environ['FABMAN_API_KEY']
     trainings = get_active_user_trainings_and_user_data(member_id, token)[0]
-    res = []
 
-    for t in trainings:
-        if "metadata" in t.keys():
-            course_metadata = (t.get("metadata") or {}).get("courses_cm") or {}
+    return absolved_trainings(trainings)
 
-            t["yt_url"] = course_metadata.get("yt_url") or ""
-            t["for_web"] = bool(t["notes"] and "for_web" in t["notes"])
-            t["for_offline"] = bool(t["notes"] and "for_offline" in t["notes"])
 
-            t["cs_name"] = course_metadata.get("cs_name") or t["title"]
-            t["en_name"] = course_metadata.get("en_name") or t["title"]
+def get_member_dashboard_fn(member_id: str, links: bool = False) -> Dict | Response:
+    """
+    Absolved and available trainings of member (same items as /absolved_trainings and /available_trainings) from one
+    member fetch and one catalog read, optionally with link details of every available training.
+    :param member_id: ID of member in Fabman DB
+    :param links: add link details (as /get_training_links) of available trainings
+    :return: dict with absolved, available and links lists
+    """
 
-            del t["metadata"]
-            del t["notes"]
+    token = os.environ['FABMAN_API_KEY']
+    user_active_trainings, user_data = get_active_user_trainings_and_user_data(member_id, token)
 
-        res.append(t)
+    catalog = get_catalog_projection(fetch_training_courses(user_data.get("privileges") != "admin", token))
+    user_active_trainings_ids = {at["id"] for at in user_active_trainings}
 
-    return res
+    if conditional_etag("dashboard", member_id, user_data["lockVersion"], catalog.version, links,
+                        [(t["id"], t["date"], course_version(t["course"])) for t in user_active_trainings]):
+        return Response(status=304)
+
+    available = available_trainings(member_id, catalog, user_active_trainings_ids)
+    dashboard = {
+        "absolved": absolved_trainings(user_active_trainings),
+        "available": available
+    }
+
+    if links:
+        dashboard["links"] = [
+            {
+                "id": a["id"],
+                "en_name": a["en_name"],
+                "cs_name": a["cs_name"],
+                "quiz_url": a["quiz_url"],
+                "yt_url": catalog.by_id[a["id"]]["yt_url"] or None,
+                "wiki_url": catalog.by_id[a["id"]]["wiki_url"]
+            } for a in available
+        ]
+
+    return dashboard
+
+
+def event_member_id(details: Dict) -> Union[int, None]:
+    """
+    Find ID of affected member in details of Fabman activity event.
+    :param details: "details" object of Fabman webhook event
+    :return: member ID or None if event is not related to any member
+    """
+
+    member = details.get("member")
+
+    if isinstance(member, dict):
+        return member.get("id")
+
+    if isinstance(member, int):
+        return member
+
+    for key in ("training", "memberTraining", "trainingRecord"):
+        nested = details.get(key)
+
+        if isinstance(nested, dict) and nested.get("member"):
+            return nested["member"]
+
+    return None
+
+
+def fabman_webhook_fn(request: Request) -> Response:
+    """
+    Fabman webhook listener, keeps read replica and cache fresh (member, member's trainings and training-course
+    updates).
+    """
+
+    token = request.headers.get("Authorization") or request.args.get("token") or ""
+
+    if not FABMAN_WEBHOOK_TOKEN or not hmac.compare_digest(token, FABMAN_WEBHOOK_TOKEN):
+        raise CustomError("Unauthorized webhook access")
+
+    request_data = request.json
+    event_type = request_data.get("type") or ""
+    details = request_data.get("details") or {}
+
+    metrics.incr(f'webhook.fabman.{event_type or "unknown"}')
+    course_event = "trainingcourse" in event_type.lower().replace("_", "").replace("-", "")
+
+    if course_event:
+        cache.invalidate(f'{FABMAN_API_URL}/training-courses')
+
+    if not replica.enabled:
+        return Response("Read replica is disabled, event ignored", 200)
+
+    if course_event:
+        sync_training_courses()
+
+        return Response("Training-courses synced", 200)
+
+    member_id = event_member_id(details)
+
+    if not event_type.startswith("member") or not member_id:
+        return Response("Not a member event, ignored", 200)
+
+    if event_type == "member_deleted":
+        replica.delete_member(member_id)
+
+        return Response("Member removed from replica", 200)
+
+    member_changed(member_id)
+    fetch_member(member_id, FABMAN_API_KEY)
+
+    return Response("Member synced", 200)
 
 
 # def activities_notifications_fn(request: Request) -> Response:
@@ -561,6 +988,79 @@ def get_list_of_absolved_trainings_fn(member_id: str) -> List[dict]:
 #     return Response("LOCKED RESOURCE", 200)
 
 
+def member_available_trainings(member_id: int | str, token: str, catalogs: Dict[bool, CatalogProjection],
+                               catalogs_lock: Lock) -> Dict:
+    """
+    Available trainings of one member of batch, runs in worker thread (without request context).
+    :param member_id: ID of member in Fabman DB
+    :param token: Fabman API token with admin permissions
+    :param catalogs: catalog projections shared by all members of batch (by for_members flag)
+    :param catalogs_lock: lock of shared catalogs
+    :return: NDJSON row with member_id and trainings or error
+    """
+
+    try:
+        user_active_trainings, user_data = get_active_user_trainings_and_user_data(member_id, token)
+        for_members = user_data.get("privileges") != "admin"
+
+        with catalogs_lock:
+            if for_members not in catalogs:
+                catalogs[for_members] = get_catalog_projection(fetch_training_courses(for_members, token))
+
+        active_trainings_ids = {at["id"] for at in user_active_trainings}
+
+        return {
+            "member_id": member_id,
+            "trainings": available_trainings(member_id, catalogs[for_members], active_trainings_ids)
+        }
+
+    except Exception as e:
+        metrics.incr("batch.member_error")
+
+        return {"member_id": member_id, "error": f'{e.__class__.__name__}: {str(e)}'}
+
+
+def get_available_trainings_batch_fn(request: Request) -> Response:
+    """
+    Available trainings of many members, members are fetched concurrently by bounded pool of workers and catalog is
+    read once per batch. Rows are streamed as NDJSON in order of completion.
+    """
+
+    member_ids = (request.json or {}).get("member_ids")
+    token = request.headers.get("Authorization")
+
+    if not token:
+        raise CustomError("Unauthorized access")
+
+    if not isinstance(member_ids, list) or not member_ids:
+        raise ValueError("Missing list of member_ids")
+
+    if len(member_ids) > BATCH_MAX_MEMBERS:
+        raise CustomError(f'Too many members in batch, max {BATCH_MAX_MEMBERS}')
+
+    catalogs = {}
+    catalogs_lock = Lock()
+    start = time.time()
+    futures = [
+        batch_executor.submit(member_available_trainings, member_id, token, catalogs, catalogs_lock)
+        for member_id in dict.fromkeys(member_ids)
+    ]
+
+    def rows():
+        try:
+            for future in as_completed(futures):
+                yield dumps(future.result()) + b"\n"
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+            metrics.observe("batch.members", len(futures))
+            metrics.observe("batch.duration", round(time.time() - start, 3))
+
+    return Response(rows(), 200, mimetype="application/x-ndjson")
+
+
 def get_training_links_fn(request: Request) -> Response:
     request_data = request.json
 
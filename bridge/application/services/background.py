@@ -0,0 +1,45 @@
+import time
+import traceback
+from threading import Thread, Event
+from typing import Callable
+
+from flask import Flask
+
+
+def run_periodically(name: str, interval: float, fn: Callable, app: Flask, delay: float = 0,
+                     stop: Event = None) -> Thread:
+    """
+    Run function in daemon thread (inside application context) every interval seconds.
+    :param name: name of thread
+    :param interval: seconds between starts of two runs
+    :param fn: function without arguments
+    :param app: Flask application
+    :param delay: seconds before the first run
+    :param stop: optional event for stopping the loop
+    :return: started thread
+    """
+
+    stop = stop or Event()
+
+    def loop():
+        if stop.wait(delay):
+            return
+
+        while True:
+            start = time.monotonic()
+
+            try:
+                with app.app_context():
+                    fn()
+
+            except Exception:
+                print(f'ERROR IN BACKGROUND TASK {name}:')
+                print(traceback.format_exc())
+
+            if stop.wait(max(interval - (time.monotonic() - start), 0)):
+                return
+
+    thread = Thread(target=loop, name=name, daemon=True)
+    thread.start()
+
+    return thread
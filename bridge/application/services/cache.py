@@ -0,0 +1,273 @@
+import json
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, local
+from typing import Any, Callable, Dict, Tuple, Union
+
+from application.configs.config import CACHE_TTL, CACHE_MAX_STALE, CACHE_REFRESH_AHEAD, CACHE_BACKEND, CACHE_PATH
+from application.services.metrics import metrics
+from application.services.serialization import dumps
+
+
+class MemoryCacheBackend:
+    """
+    Cache storage private to current worker process.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._claims: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Union[Tuple[Any, float], None]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any, fetched_at: float) -> None:
+        self._entries[key] = (value, fetched_at)
+        self._claims.pop(key, None)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def delete_older(self, fetched_before: float) -> None:
+        with self._lock:
+            for key in [k for k, (_, fetched_at) in self._entries.items() if fetched_at < fetched_before]:
+                del self._entries[key]
+
+    def claim_refresh(self, key: str, claim_for: float) -> bool:
+        now = time.time()
+
+        with self._lock:
+            if self._claims.get(key, 0) > now:
+                return False
+
+            self._claims[key] = now + claim_for
+
+            return True
+
+    def release_refresh(self, key: str) -> None:
+        self._claims.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache storage shared by all worker processes on the node (SQLite in WAL mode).
+    Values are stored as JSON, deserialized values are kept per process until the shared entry changes.
+    """
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, fetched_at REAL NOT NULL, "\
+             "refresh_claimed_until REAL NOT NULL DEFAULT 0)"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = local()
+        self._decoded: Dict[str, Tuple[Any, float]] = {}
+        self.connection().execute(self.SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+
+        if not conn:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    def get(self, key: str) -> Union[Tuple[Any, float], None]:
+        decoded = self._decoded.get(key)
+        row = self.connection().execute(
+            "SELECT fetched_at, CASE WHEN fetched_at = ? THEN NULL ELSE value END FROM cache WHERE key = ?",
+            (decoded[1] if decoded else -1, key)
+        ).fetchone()
+
+        if not row:
+            self._decoded.pop(key, None)
+
+            return None
+
+        if row[1] is None:
+            return decoded
+
+        decoded = (json.loads(row[1]), row[0])
+        self._decoded[key] = decoded
+
+        return decoded
+
+    def set(self, key: str, value: Any, fetched_at: float) -> None:
+        self.connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, fetched_at, refresh_claimed_until) VALUES (?, ?, ?, 0)",
+            (key, dumps(value), fetched_at)
+        )
+        self._decoded[key] = (value, fetched_at)
+
+    def delete(self, key: str) -> None:
+        self.connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        self.connection().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def delete_older(self, fetched_before: float) -> None:
+        self.connection().execute("DELETE FROM cache WHERE fetched_at < ?", (fetched_before,))
+
+    def claim_refresh(self, key: str, claim_for: float) -> bool:
+        now = time.time()
+
+        return bool(self.connection().execute(
+            "UPDATE cache SET refresh_claimed_until = ? WHERE key = ? AND refresh_claimed_until <= ?",
+            (now + claim_for, key, now)
+        ).rowcount)
+
+    def release_refresh(self, key: str) -> None:
+        self.connection().execute("UPDATE cache SET refresh_claimed_until = 0 WHERE key = ?", (key,))
+
+    def size(self) -> int:
+        return self.connection().execute("SELECT count(*) FROM cache").fetchone()[0]
+
+
+class FabmanCache:
+    """
+    Cache of Fabman reads with stale-while-revalidate.
+    Fresh entry (younger than ttl) is returned directly, stale entry (younger than ttl + max_stale) is returned
+    and refreshed in background, older entries are fetched inline. Hot entries (accessed by current process during
+    last ttl) are refreshed by refresh_hot() before they expire. Only one process refreshes shared entry at a time.
+    """
+
+    REFRESH_CLAIM_SECONDS = 30
+
+    def __init__(self, ttl: float = 300, max_stale: float = 600, refresh_ahead: float = 0.8, backend=None):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_ahead = refresh_ahead
+        self.backend = backend or MemoryCacheBackend()
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._accessed: Dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Get cached value.
+        :param key: cache key (Fabman URL)
+        :param loader: function fetching current value, it's also used for background refreshes
+        :return: cached or fetched value
+        """
+
+        if not self.enabled:
+            return loader()
+
+        now = time.time()
+        self._loaders[key] = loader
+        self._accessed[key] = now
+        entry = self.backend.get(key)
+
+        if entry:
+            value, fetched_at = entry
+            age = now - fetched_at
+
+            if age < self.ttl:
+                metrics.incr("cache.hit")
+
+                return value
+
+            if age < self.ttl + self.max_stale:
+                metrics.incr("cache.stale_hit")
+                self._schedule_refresh(key)
+
+                return value
+
+        metrics.incr("cache.miss")
+
+        return self.set(key, loader())
+
+    def set(self, key: str, value: Any) -> Any:
+        self.backend.set(key, value, time.time())
+
+        return value
+
+    def invalidate(self, prefix: str) -> None:
+        """
+        Atomically remove all entries with key starting with prefix (in all processes sharing the backend).
+        :param prefix: key or prefix of keys (Fabman URL)
+        :return: None
+        """
+
+        self.backend.delete_prefix(prefix)
+
+    def invalidate_resource(self, url: str) -> None:
+        """
+        Remove cached resource in all its variants (URL with query string or trailing slash).
+        :param url: URL of Fabman resource without query string
+        :return: None
+        """
+
+        self.backend.delete(url)
+        self.backend.delete_prefix(f'{url}?')
+        self.backend.delete_prefix(f'{url}/')
+
+    def _schedule_refresh(self, key: str) -> None:
+        if key in self._loaders and self.backend.claim_refresh(key, self.REFRESH_CLAIM_SECONDS):
+            self._executor.submit(self._refresh, key)
+
+    def _refresh(self, key: str) -> None:
+        start = time.time()
+
+        try:
+            self.set(key, self._loaders[key]())
+            metrics.incr("cache.refresh")
+            metrics.observe("cache.refresh_duration", round(time.time() - start, 3))
+
+        except Exception:
+            self.backend.release_refresh(key)
+            metrics.incr("cache.refresh_error")
+            print(f'ERROR DURING CACHE REFRESH OF {key}:')
+            print(traceback.format_exc())
+
+    def refresh_hot(self) -> None:
+        """
+        Refresh entries accessed during last ttl, which are close to their expiration, and drop expired entries.
+        """
+
+        now = time.time()
+
+        for key, accessed_at in list(self._accessed.items()):
+            if now - accessed_at >= self.ttl:
+                continue
+
+            entry = self.backend.get(key)
+
+            if entry and now - entry[1] >= self.ttl * self.refresh_ahead:
+                self._schedule_refresh(key)
+
+        self.backend.delete_older(now - self.ttl - self.max_stale)
+        metrics.set("cache.entries", self.backend.size())
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    """
+    Create cache backend by name.
+    :param name: "memory" (per process) or "sqlite" (shared by worker processes)
+    :return: cache backend
+    """
+
+    if name == "sqlite":
+        return SQLiteCacheBackend(CACHE_PATH)
+
+    return MemoryCacheBackend()
+
+
+cache = FabmanCache(CACHE_TTL, CACHE_MAX_STALE, CACHE_REFRESH_AHEAD, create_backend())
@@ -0,0 +1,119 @@
+from collections import Counter
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List
+
+from flask import Flask, Response, g, has_request_context, request
+
+from application.configs.config import CALL_BUDGET_DEBUG, FABMAN_API_URL
+from application.services.metrics import metrics
+from application.services.tracing import normalize_path
+
+
+# max count of Fabman calls per request of each route (with cold cache and without read replica)
+ROUTE_BUDGETS: Dict[str, int] = {
+    "main.service_healthcheck": 0,
+    "main.service_metrics": 0,
+    "main.get_list_of_absolved_trainings": 1,
+    "main.get_list_of_available_trainings": 2,
+    "main.get_member_dashboard": 2,
+    "main.get_training_links": 2,
+    "main.training_expiration": 2,
+    "main.member_changed": 0,
+    "main.add_classmarker_training": 7,
+    "main.activities_notifications": 3
+}
+
+_recorders: List[Counter] = []
+_lock = Lock()
+
+
+def call_name(method: str, url: str) -> str:
+    """
+    Low-cardinality name of outbound call.
+    :param method: HTTP method
+    :param url: URL of call
+    :return: e.g. "GET /members/{id}"
+    """
+
+    return f'{method} {normalize_path(url.replace(FABMAN_API_URL, ""))}'
+
+
+def record_call(method: str, url: str) -> None:
+    """
+    Count outbound call for current request and for all active expect_calls blocks.
+    :param method: HTTP method
+    :param url: URL of call
+    :return: None
+    """
+
+    name = call_name(method, url)
+
+    if has_request_context():
+        g.setdefault("outbound_calls", Counter())[name] += 1
+
+    if _recorders:
+        with _lock:
+            for recorder in _recorders:
+                recorder[name] += 1
+
+
+def init_app(app: Flask) -> None:
+    app.after_request(audit_request)
+
+
+def audit_request(response: Response) -> Response:
+    """
+    Compare outbound calls of finished request with budget of its route, add debug headers.
+    """
+
+    if not request.endpoint:
+        return response
+
+    calls = g.get("outbound_calls") or Counter()
+    total = sum(calls.values())
+    budget = ROUTE_BUDGETS.get(request.endpoint)
+
+    metrics.observe(f'calls.{request.endpoint}', total)
+
+    if budget is not None and total > budget:
+        metrics.incr(f'calls.over_budget.{request.endpoint}')
+        print(f'CALL BUDGET EXCEEDED: {request.endpoint} made {total} Fabman calls (budget {budget}): {dict(calls)}')
+
+    if CALL_BUDGET_DEBUG:
+        response.headers["X-Fabman-Calls"] = str(total)
+        response.headers["X-Fabman-Calls-Detail"] = ", ".join(f'{name}={count}' for name, count in calls.items())
+
+    return response
+
+
+@contextmanager
+def expect_calls(max_calls: int, per_call: Dict[str, int] = None):
+    """
+    Assert max count of outbound calls made inside the block (in any thread), e.g. in tests:
+    `with expect_calls(2, {"GET /members/{id}": 1}): client.get("/available_trainings/1")`
+    :param max_calls: max count of all calls
+    :param per_call: max counts of specific calls by call name
+    :raises AssertionError: count of calls exceeded
+    :return: Counter of calls made inside the block
+    """
+
+    recorder = Counter()
+
+    with _lock:
+        _recorders.append(recorder)
+
+    try:
+        yield recorder
+
+    finally:
+        with _lock:
+            _recorders.remove(recorder)
+
+    total = sum(recorder.values())
+    if total > max_calls:
+        raise AssertionError(f'{total} outbound calls, expected at most {max_calls}: {dict(recorder)}')
+
+    for name, limit in (per_call or {}).items():
+        if recorder[name] > limit:
+            raise AssertionError(f'{recorder[name]} calls of {name}, expected at most {limit}: {dict(recorder)}')
@@ -0,0 +1,133 @@
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Tuple, Union
+
+
+MAX_CATALOG_PROJECTIONS = 4
+MAX_COURSE_PROJECTIONS = 1024
+
+_catalog_projections: "OrderedDict[str, CatalogProjection]" = OrderedDict()
+_course_projections: Dict[Tuple, Dict] = {}
+_lock = Lock()
+
+
+class CatalogProjection:
+    """
+    Render-ready view of one version of the training-courses catalog.
+    Courses are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, version: str, courses: List[Dict]):
+        self.version = version
+        self.courses = courses
+        self.ids = frozenset(c["id"] for c in courses)
+        self.by_id = {c["id"]: c for c in courses}
+
+
+def course_version(course: Dict) -> Union[Tuple, None]:
+    """
+    Version key of training-course, None if course data doesn't contain any version info.
+    :param course: training-course data from Fabman
+    :return: tuple (id, lockVersion, updatedAt) or None
+    """
+
+    if course.get("lockVersion") is None and not course.get("updatedAt"):
+        return None
+
+    return course["id"], course.get("lockVersion"), course.get("updatedAt")
+
+
+def catalog_version(trainings: List[Dict]) -> str:
+    """
+    Fingerprint of fetched training-courses catalog, changes whenever any course is added, removed or updated.
+    :param trainings: list of training-courses from Fabman
+    :return: hex digest of catalog version
+    """
+
+    digest = hashlib.sha1()
+
+    for t in trainings:
+        version = course_version(t)
+        digest.update(repr(version).encode() if version else json.dumps(t, sort_keys=True, default=str).encode())
+
+    return digest.hexdigest()
+
+
+def build_course_projection(course: Dict) -> Dict:
+    """
+    Precompute all per-course fields used by rendered trainings lists.
+    :param course: training-course data from Fabman
+    :return: render-ready course
+    """
+
+    notes = course.get("notes")
+    course_metadata = (course.get("metadata") or {}).get("courses_cm") or {}
+
+    return {
+        "id": course["id"],
+        "title": course["title"],
+        "notes": notes,
+        "yt_url": course_metadata.get("yt_url") or "",
+        "for_web": bool(notes and "for_web" in notes),
+        "for_offline": bool(notes and "for_offline" in notes),
+        "cs_name": course_metadata.get("cs_name") or course["title"],
+        "en_name": course_metadata.get("en_name") or course["title"],
+        "cm_url": course_metadata.get("cm_url") or "",
+        "wiki_url": course_metadata.get("wiki_url")
+    }
+
+
+def project_course(course: Dict) -> Dict:
+    """
+    Get render-ready course, projection is reused until the course version changes.
+    :param course: training-course data from Fabman
+    :return: render-ready course
+    """
+
+    version = course_version(course)
+
+    if not version:
+        return build_course_projection(course)
+
+    projection = _course_projections.get(version)
+
+    if not projection:
+        projection = build_course_projection(course)
+
+        with _lock:
+            if len(_course_projections) >= MAX_COURSE_PROJECTIONS:
+                _course_projections.clear()
+
+            _course_projections[version] = projection
+
+    return projection
+
+
+def get_catalog_projection(trainings: List[Dict]) -> CatalogProjection:
+    """
+    Get render-ready projection of training-courses catalog, built once per catalog version.
+    :param trainings: list of training-courses from Fabman
+    :return: catalog projection
+    """
+
+    version = catalog_version(trainings)
+
+    with _lock:
+        projection = _catalog_projections.get(version)
+
+        if projection:
+            _catalog_projections.move_to_end(version)
+
+            return projection
+
+    projection = CatalogProjection(version, [project_course(t) for t in trainings])
+
+    with _lock:
+        _catalog_projections[version] = projection
+
+        while len(_catalog_projections) > MAX_CATALOG_PROJECTIONS:
+            _catalog_projections.popitem(last=False)
+
+    return projection
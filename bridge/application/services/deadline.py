@@ -0,0 +1,97 @@
+import time
+from typing import Dict, Union
+
+from flask import Flask, g, has_request_context, request
+
+from application.configs.config import REQUEST_DEADLINE, MIN_CALL_TIMEOUT
+from application.services.error_handlers import CustomError
+from application.services.metrics import metrics
+
+
+# deadline of whole request in seconds by route, other routes use REQUEST_DEADLINE
+ROUTE_DEADLINES: Dict[str, float] = {
+    "main.service_healthcheck": 5,
+    "main.service_metrics": 5,
+    "main.get_list_of_absolved_trainings": 10,
+    "main.get_list_of_available_trainings": 10,
+    "main.get_member_dashboard": 10,
+    "main.get_training_links": 10,
+    "main.training_expiration": 20,
+    "main.member_changed": 5,
+    "main.activities_notifications": 20,
+    "main.add_classmarker_training": 30
+}
+
+
+class DeadlineExceeded(CustomError):
+    """Remaining time of request is too short for next outbound call."""
+
+
+def init_app(app: Flask) -> None:
+    app.before_request(start_deadline)
+
+
+def start_deadline() -> None:
+    """
+    Set deadline of current request by its route, caller can shorten it by X-Request-Deadline header (seconds).
+    """
+
+    budget = ROUTE_DEADLINES.get(request.endpoint, REQUEST_DEADLINE)
+
+    try:
+        budget = min(budget, float(request.headers.get("X-Request-Deadline") or budget))
+
+    except ValueError:
+        pass
+
+    g.deadline_budget = budget
+    g.deadline = time.monotonic() + budget
+
+
+def remaining() -> Union[float, None]:
+    """
+    Remaining seconds of current request, None outside of request (background tasks).
+    """
+
+    if not has_request_context() or "deadline" not in g:
+        return None
+
+    return g.deadline - time.monotonic()
+
+
+def call_timeout(max_timeout: float, call: str = "") -> float:
+    """
+    Timeout of outbound call derived from remaining time of current request.
+    :param max_timeout: timeout of the call without deadline (e.g. FABMAN_TIMEOUT)
+    :param call: name of the call for error message
+    :raises DeadlineExceeded: remaining time is shorter than MIN_CALL_TIMEOUT
+    :return: timeout in seconds
+    """
+
+    left = remaining()
+
+    if left is None:
+        return max_timeout
+
+    if left < MIN_CALL_TIMEOUT:
+        metrics.incr(f'deadline.exceeded.{request.endpoint}')
+
+        raise DeadlineExceeded("Request deadline exceeded", f'{call}: {round(left, 3)} s left of {g.deadline_budget} s')
+
+    return min(max_timeout, left)
+
+
+def budget_report() -> Dict[str, float]:
+    """
+    Deadline budget of current request and its used part, for timing output.
+    """
+
+    left = remaining()
+
+    if left is None:
+        return {}
+
+    return {
+        "deadline_budget": g.deadline_budget,
+        "deadline_used": round(g.deadline_budget - left, 3)
+    }
@@ -0,0 +1,152 @@
+import os
+import smtplib
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List
+
+from flask import Flask, has_app_context, current_app
+from flask_mail import Connection
+from jinja2 import Template
+from markupsafe import escape
+
+from application.configs.config import MAIL_USERNAME, EMAIL_RENDER_CACHE_SIZE, SMTP_TIMEOUT
+from application.services.extensions import Message
+from application.services.tracing import tracer
+from application.services.deadline import call_timeout
+
+
+class TimeoutConnection(Connection):
+    """
+    Flask-Mail SMTP connection with timeout (Flask-Mail connects without any timeout).
+    """
+
+    def __init__(self, mail_state, timeout: float):
+        super().__init__(mail_state)
+        self.timeout = timeout
+
+    def configure_host(self):
+        smtp = smtplib.SMTP_SSL if self.mail.use_ssl else smtplib.SMTP
+        host = smtp(self.mail.server, self.mail.port, timeout=self.timeout)
+        host.set_debuglevel(int(self.mail.debug))
+
+        if self.mail.use_tls:
+            host.starttls()
+
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+
+        return host
+
+
+class EmailRenderer:
+    """
+    Email templates compiled once on startup, rendered bodies are memoized per (template, context).
+    Values differing for every recipient (e.g. personal URL) are passed as recipient_context, they are kept out of
+    the memo key and substituted to the memoized body, so the body of one course is rendered only once.
+    Rendering and sending doesn't need request context, so it could be used by background workers.
+    """
+
+    def __init__(self, max_cached: int = 256):
+        self.app = None
+        self.max_cached = max_cached
+        self.templates: Dict[str, Template] = {}
+        self._rendered: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = Lock()
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+
+        if not os.path.isdir(app.template_folder):
+            return
+
+        for name in sorted(os.listdir(app.template_folder)):
+            if name.endswith(".html"):
+                self.templates[name] = app.jinja_env.get_template(name)
+
+    def get_template(self, name: str) -> Template:
+        template = self.templates.get(name)
+
+        if not template:
+            template = self.app.jinja_env.get_template(name)
+            self.templates[name] = template
+
+        return template
+
+    def render(self, template: str, recipient_context: Dict[str, str] = None, **context) -> str:
+        """
+        Render email template, bodies with hashable context (course title, ...) are memoized.
+        :param template: name of template file
+        :param recipient_context: per-recipient template variables, they have to be printed by template as they are
+        (without filters)
+        :param context: template variables
+        :return: rendered HTML body
+        """
+
+        recipient_context = recipient_context or {}
+
+        try:
+            key = (template, tuple(sorted(context.items())), tuple(sorted(recipient_context)))
+            hash(key)
+
+        except TypeError:
+            return self.get_template(template).render(**context, **recipient_context)
+
+        with self._lock:
+            body = self._rendered.get(key)
+
+            if body is not None:
+                self._rendered.move_to_end(key)
+
+        if body is None:
+            body = self.get_template(template).render(
+                **context,
+                **{name: self.placeholder(name) for name in recipient_context}
+            )
+
+            with self._lock:
+                self._rendered[key] = body
+
+                while len(self._rendered) > self.max_cached:
+                    self._rendered.popitem(last=False)
+
+        for name, value in recipient_context.items():
+            body = body.replace(self.placeholder(name), str(escape(value)))
+
+        return body
+
+    @staticmethod
+    def placeholder(name: str) -> str:
+        return f'__recipient_{name}__'
+
+    def send(self, subject: str, recipients: List[str], template: str, recipient_context: Dict[str, str] = None,
+             **context) -> None:
+        """
+        Render and send email, works also outside of application context.
+        :param subject: email subject
+        :param recipients: list of email addresses
+        :param template: name of template file
+        :param recipient_context: per-recipient template variables (not part of memo key)
+        :param context: template variables
+        :return: None
+        """
+
+        msg = Message(subject, sender=MAIL_USERNAME, recipients=recipients)
+        msg.html = self.render(template, recipient_context, **context)
+
+        with tracer.span("smtp send", kind="client", template=template, recipients=len(recipients)):
+            timeout = call_timeout(SMTP_TIMEOUT, "SMTP send")
+
+            if has_app_context():
+                self._send(msg, timeout)
+
+            else:
+                with self.app.app_context():
+                    self._send(msg, timeout)
+
+    @staticmethod
+    def _send(msg: Message, timeout: float) -> None:
+        with TimeoutConnection(current_app.extensions["mail"], timeout) as connection:
+            msg.send(connection)
+
+
+emails = EmailRenderer(EMAIL_RENDER_CACHE_SIZE)
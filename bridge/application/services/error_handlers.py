@@ -1,11 +1,8 @@
-from flask import Response, render_template, request
+from flask import Response, request
 import traceback
 from functools import wraps
 from typing import List
 
-from ..services.extensions import mail, Message
-from ..configs.config import MAIL_USERNAME, FABLAB_SUPPORT_EMAIL, FABMAN_API_KEY
-
 
 ERROR_WHITELIST = [
     "Ran out of attempts",
@@ -25,36 +22,12 @@ class CustomError(Exception):
 
 
 def handle_exception(fn_name: str, e: Exception, error_stack: List[str], member_id: int = None) -> Response:
-    from ..services.api_functions import data_from_get_request
+    from ..services.error_reporting import error_reporter
 
     error = f'{e.__class__.__name__}: {str(e)}'
 
     if fn_name == "add_classmarker_training" and str(e) not in ERROR_WHITELIST:
-        user_email = None
-
-        try:
-            if member_id:
-                member_data = data_from_get_request(f'https://fabman.io/api/v1/members/{member_id}', FABMAN_API_KEY)
-                user_email = member_data["emailAddress"]
-
-                if not user_email:
-                    raise ValueError("Empty user email in error handler")
-
-                msg = Message("Fablab info - process error", sender=MAIL_USERNAME, recipients=[user_email])
-                msg.html = render_template("unexpected_error.html")
-                mail.send(msg)
-
-        except Exception:
-            error_stack.append("ERROR DURING SENDING FAIL EMAIL TO USER:")
-            error_stack.extend(traceback.format_exc().split("\n"))
-
-        msg = Message("Fablab info - process error", sender=MAIL_USERNAME, recipients=[FABLAB_SUPPORT_EMAIL])
-        msg.html = render_template(
-            "unexpected_error_support.html",
-            user_email=user_email,
-            error_stack=error_stack
-        )
-        mail.send(msg)
+        error_reporter.report(fn_name, e, error_stack, member_id)
 
     print("\n".join(error_stack))
 
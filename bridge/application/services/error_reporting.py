@@ -0,0 +1,187 @@
+import re
+import time
+import traceback
+from datetime import datetime
+from queue import Queue, Full
+from threading import Lock, Thread
+from typing import Dict, List
+
+from flask import Flask
+
+from application.configs.config import FABLAB_SUPPORT_EMAIL, FABMAN_API_KEY, FABMAN_API_URL, ERROR_ALERT_INTERVAL,\
+    ERROR_DIGEST_INTERVAL, ERROR_QUEUE_SIZE
+from application.services.background import run_periodically
+from application.services.emails import emails
+from application.services import identity_map
+from application.services.metrics import metrics
+from application.services.tracing import tracer
+
+
+FRAME_LINE = re.compile(r'File "([^"]+)", line \d+, in (\S+)')
+# tokens (Fernet, base64, hex keys) are runs of at least 16 token characters with a digit, hex runs are 8+ chars
+TOKENS = re.compile(r"(?=[\w+=-]*\d)[\w+=-]{16,}|\b[0-9a-fA-F]{8,}\b")
+NUMBERS = re.compile(r"\d+")
+
+
+def error_signature(fn_name: str, e: Exception, error_stack: List[str]) -> str:
+    """
+    Signature of error for de-duplication: endpoint, exception class, message without IDs and tokens and innermost
+    frame.
+    :param fn_name: name of failed endpoint function
+    :param e: raised exception
+    :param error_stack: formatted traceback rows
+    :return: signature string
+    """
+
+    frames = [FRAME_LINE.search(row) for row in error_stack]
+    frames = [f for f in frames if f]
+    frame = f'{frames[-1].group(1).split("/")[-1]}:{frames[-1].group(2)}' if frames else ""
+
+    message = NUMBERS.sub("N", TOKENS.sub("T", str(e)))
+
+    return f'{fn_name} {e.__class__.__name__}: {message} @ {frame}'
+
+
+class ErrorReporter:
+    """
+    Aggregated error notifications of failed webhooks.
+    Every event only queues email to the affected user (the only per-event side effect, it's never suppressed).
+    Support gets one alert per signature per alert interval and periodic digest with counts of all errors.
+    """
+
+    def __init__(self, alert_interval: float = 3600, digest_interval: float = 3600, queue_size: int = 1000):
+        self.alert_interval = alert_interval
+        self.digest_interval = digest_interval
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self._errors: Dict[str, Dict] = {}
+        self._last_alert: Dict[str, float] = {}
+        self._since = datetime.now()
+        self._lock = Lock()
+
+    def init_app(self, app: Flask) -> None:
+        Thread(target=self._process_queue, name="error-notifications", daemon=True).start()
+        run_periodically("error-digest", self.digest_interval, self.send_digest, app, self.digest_interval)
+
+    def report(self, fn_name: str, e: Exception, error_stack: List[str], member_id: int = None) -> None:
+        """
+        Record error and queue notifications, nothing is sent inline.
+        :param fn_name: name of failed endpoint function
+        :param e: raised exception
+        :param error_stack: formatted traceback rows
+        :param member_id: ID of affected member, if known
+        :return: None
+        """
+
+        signature = error_signature(fn_name, e, error_stack)
+        now = time.time()
+
+        with self._lock:
+            error = self._errors.setdefault(signature, {"signature": signature, "count": 0, "users": set()})
+            error["count"] += 1
+            error["last_seen"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            error["error_stack"] = error_stack
+
+            if member_id:
+                error["users"].add(member_id)
+
+            alert = now - self._last_alert.get(signature, 0) >= self.alert_interval
+
+            if alert:
+                self._last_alert[signature] = now
+
+        metrics.incr("errors.reported")
+        notify_user = bool(member_id)
+
+        if not alert and not notify_user:
+            metrics.incr("errors.suppressed")
+
+            return
+
+        user_email = None
+
+        if notify_user:
+            member_data = identity_map.get_any_variant(f'{FABMAN_API_URL}/members/{member_id}') or {}
+            user_email = member_data.get("emailAddress")
+
+        try:
+            self.queue.put_nowait(
+                (member_id if notify_user else None, user_email, alert, error_stack, tracer.current_traceparent())
+            )
+            metrics.incr("errors.queued")
+
+        except Full:
+            metrics.incr("errors.dropped")
+
+    def _process_queue(self) -> None:
+        while True:
+            member_id, user_email, alert, error_stack, traceparent = self.queue.get()
+
+            try:
+                with tracer.span("error notification", traceparent):
+                    self._notify(member_id, user_email, alert, error_stack)
+
+            except Exception:
+                print("ERROR DURING SENDING ERROR NOTIFICATIONS:")
+                print(traceback.format_exc())
+
+            finally:
+                self.queue.task_done()
+
+    def _notify(self, member_id: int, user_email: str, alert: bool, error_stack: List[str]) -> None:
+        from application.services.api_functions import data_from_get_request
+
+        if member_id:
+            try:
+                if not user_email:
+                    member_data = data_from_get_request(f'{FABMAN_API_URL}/members/{member_id}', FABMAN_API_KEY)
+                    user_email = member_data["emailAddress"]
+
+                if not user_email:
+                    raise ValueError("Empty user email in error handler")
+
+                emails.send("Fablab info - process error", [user_email], "unexpected_error.html")
+                metrics.incr("errors.user_emails")
+
+            except Exception:
+                error_stack = error_stack + ["ERROR DURING SENDING FAIL EMAIL TO USER:"]\
+                    + traceback.format_exc().split("\n")
+
+        if alert:
+            emails.send(
+                "Fablab info - process error",
+                [FABLAB_SUPPORT_EMAIL],
+                "unexpected_error_support.html",
+                user_email=user_email,
+                error_stack=error_stack
+            )
+            metrics.incr("errors.alerts")
+
+    def send_digest(self) -> None:
+        """
+        Send digest of all errors recorded since the last digest to support, if there are any repeated errors.
+        Alert times older than alert interval are evicted (they don't suppress anything any more).
+        """
+
+        expired = time.time() - self.alert_interval
+
+        with self._lock:
+            errors = sorted(self._errors.values(), key=lambda e: -e["count"])
+            since = self._since
+            self._errors = {}
+            self._since = datetime.now()
+            self._last_alert = {k: t for k, t in self._last_alert.items() if t > expired}
+
+        if not any(e["count"] > 1 for e in errors):
+            return
+
+        emails.send(
+            "Fablab info - error digest",
+            [FABLAB_SUPPORT_EMAIL],
+            "error_digest.html",
+            since=since.strftime("%Y-%m-%d %H:%M:%S"),
+            errors=[dict(e, users=sorted(e["users"])) for e in errors]
+        )
+        metrics.incr("errors.digests")
+
+
+error_reporter = ErrorReporter(ERROR_ALERT_INTERVAL, ERROR_DIGEST_INTERVAL, ERROR_QUEUE_SIZE)
@@ -1,4 +1,7 @@
-from flasgger import Swagger, swag_from
+from threading import Lock
+from typing import Callable
+
+from flask import Flask
 from flask_mail import Mail, Message
 
 
@@ -36,6 +39,72 @@ SWAGGER_TEMPLATE = {
     }
 }
 
+SWAGGER_PATHS = ("/apidocs", "/apispec", "/flasgger_static", "/oauth2-redirect.html")
+
+
+def swag_from(specs_name: str) -> Callable:
+    """
+    Attach name of Swagger specs to view function, specs are looked up in swagger_config by
+    resolve_swagger_specs() when docs are built (neither flasgger nor swagger_config is imported on startup).
+    :param specs_name: name of specs dict in application.configs.swagger_config
+    :return: decorator
+    """
+
+    def decorator(function):
+        function.specs_name = specs_name
+
+        return function
+
+    return decorator
+
+
+def resolve_swagger_specs(app: Flask) -> None:
+    """
+    Attach Swagger specs named by swag_from() to view functions of app (read by flasgger as specs_dict).
+    :param app: Flask app with registered blueprints
+    :return: None
+    """
+
+    from application.configs import swagger_config
+
+    for function in app.view_functions.values():
+        specs_name = getattr(function, "specs_name", None)
+
+        if specs_name:
+            function.specs_dict = getattr(swagger_config, specs_name)
+
+
+def create_swagger():
+    """Create flasgger extension, flasgger (and its dependencies) is imported only here."""
+    from flasgger import Swagger
+
+    return Swagger(template=SWAGGER_TEMPLATE)
+
+
+class LazySwaggerDocs:
+    """
+    WSGI middleware building Swagger docs on the first request of /apidocs (or spec, static files), other requests
+    are passed to the application. Docs are served by separate Flask app with the same blueprints.
+    """
+
+    def __init__(self, wsgi_app: Callable, build_docs_app: Callable[[], Flask]):
+        self.wsgi_app = wsgi_app
+        self.build_docs_app = build_docs_app
+        self.docs_app = None
+        self._lock = Lock()
+
+    def get_docs_app(self) -> Flask:
+        with self._lock:
+            if not self.docs_app:
+                self.docs_app = self.build_docs_app()
+
+        return self.docs_app
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(SWAGGER_PATHS):
+            return self.get_docs_app().wsgi_app(environ, start_response)
+
+        return self.wsgi_app(environ, start_response)
+
 
 mail = Mail()
-swagger = Swagger(template=SWAGGER_TEMPLATE)
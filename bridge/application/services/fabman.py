@@ -0,0 +1,194 @@
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Tuple, Union
+
+import requests
+
+from application.configs.config import FABMAN_API_KEY, FABMAN_API_URL, FABMAN_TIMEOUT, FABMAN_BREAKER_FAILURE_RATE,\
+    FABMAN_BREAKER_MIN_CALLS, FABMAN_BREAKER_WINDOW, FABMAN_BREAKER_SLOW_CALL, FABMAN_BREAKER_OPEN_SECONDS,\
+    FABMAN_LAST_GOOD_SIZE, FABMAN_MAX_CONCURRENCY, FABMAN_BATCH_CONCURRENCY, FABMAN_RATE_LIMIT
+from application.services.error_handlers import CustomError
+from application.services.metrics import metrics
+from application.services.tracing import tracer, normalize_path
+from application.services.call_budget import record_call
+from application.services import identity_map
+from application.services.deadline import call_timeout
+from application.services.recording import recorder
+from application.services.lanes import LaneTimeout, PriorityLanes, current_lane
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class FabmanUnavailable(CustomError):
+    """Fabman API is down, too slow or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over the outcomes of the last `window` calls. Errors, 5xx/429 responses and calls slower than
+    slow_call seconds are failures. Circuit opens when failure rate reaches failure_rate (after min_calls calls),
+    rejects all calls for open_seconds and then lets single probe through (half-open). Successful probe closes
+    the circuit, failed probe opens it again.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 10, window: int = 20,
+                 slow_call: float = 5, open_seconds: float = 30):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = Lock()
+        metrics.set(f'breaker.{name}.state', STATES[CLOSED])
+
+    def _transition(self, state: str) -> None:
+        print(f'Circuit breaker {self.name}: {self.state} -> {state}')
+        metrics.incr(f'breaker.{self.name}.{self.state}_to_{state}')
+        metrics.set(f'breaker.{self.name}.state', STATES[state])
+        self.state = state
+
+        if state == OPEN:
+            self._opened_at = time.time()
+
+        if state == CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """
+        Check if call can be made, claims the probe in half-open state.
+        :return: bool - call is allowed
+        """
+
+        with self._lock:
+            if self.state == OPEN and time.time() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+
+            if self.state == CLOSED:
+                return True
+
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+
+                return True
+
+        metrics.incr(f'breaker.{self.name}.rejected')
+
+        return False
+
+    def record(self, success: bool, duration: float) -> None:
+        """
+        Record outcome of allowed call.
+        :param success: call didn't fail
+        :param duration: duration of call in seconds
+        :return: None
+        """
+
+        failed = not success or duration >= self.slow_call
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._transition(OPEN if failed else CLOSED)
+
+                return
+
+            self._outcomes.append(failed)
+
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls\
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._transition(OPEN)
+
+
+class LastKnownGood:
+    """
+    Bounded store of the last successful Fabman GET responses (raw JSON, decoded by every reader, so callers can't
+    change stored data), used as fallback when Fabman is unavailable.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def put(self, url: str, content: bytes) -> None:
+        with self._lock:
+            self._entries[url] = (content, time.time())
+            self._entries.move_to_end(url)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, url: str) -> Union[Tuple[bytes, float], None]:
+        return self._entries.get(url)
+
+
+def fabman_request(method: str, url: str, token: str = FABMAN_API_KEY, **kwargs) -> requests.Response:
+    """
+    Call Fabman API with timeout through the circuit breaker, in priority lane of the originating route.
+    :param method: HTTP method
+    :param url: API URL
+    :param token: Fabman API token
+    :param kwargs: other arguments of requests.request (json, data, ...)
+    :raises FabmanUnavailable: circuit is open, no free slot of lane, request failed or timed out, or Fabman responded
+        with 5xx/429
+    :raises DeadlineExceeded: remaining time of current request is too short for the call
+    :return: Fabman response
+    """
+
+    with tracer.span(f'fabman {method} {normalize_path(url.replace(FABMAN_API_URL, ""))}', kind="client") as span:
+        record_call(method, url)
+
+        if method != "GET":
+            identity_map.invalidate(url)
+
+        lane = current_lane()
+
+        try:
+            with lanes.slot(lane, call_timeout(FABMAN_TIMEOUT, f'{method} {url}')) as queue_delay:
+                if span:
+                    span.set(lane=lane, queue_delay=queue_delay)
+
+                timeout = call_timeout(FABMAN_TIMEOUT, f'{method} {url}')
+
+                if not breaker.allow():
+                    raise FabmanUnavailable("Fabman API unavailable (circuit open)", f'{method} {url}')
+
+                start = time.time()
+                res = requests.request(method, url, headers={"Authorization": f'{token}'}, timeout=timeout, **kwargs)
+
+        except LaneTimeout as e:
+            raise FabmanUnavailable("Fabman API busy", f'{method} {url}, {e}')
+
+        except requests.RequestException as e:
+            breaker.record(False, time.time() - start)
+
+            raise FabmanUnavailable("Fabman API unavailable", f'{method} {url}, {e.__class__.__name__}: {e}')
+
+        if span:
+            span.set(status_code=res.status_code)
+
+        if recorder.enabled:
+            recorder.record_call(method, url, kwargs.get("json", kwargs.get("data")), res)
+
+        unavailable = res.status_code >= 500 or res.status_code == 429
+        breaker.record(not unavailable, time.time() - start)
+
+        if unavailable:
+            raise FabmanUnavailable("Fabman API unavailable", f'{method} {url}, {res.status_code} {res.text}')
+
+        return res
+
+
+breaker = CircuitBreaker("fabman", FABMAN_BREAKER_FAILURE_RATE, FABMAN_BREAKER_MIN_CALLS, FABMAN_BREAKER_WINDOW,
+                         FABMAN_BREAKER_SLOW_CALL, FABMAN_BREAKER_OPEN_SECONDS)
+last_known_good = LastKnownGood(FABMAN_LAST_GOOD_SIZE)
+lanes = PriorityLanes("fabman", FABMAN_MAX_CONCURRENCY, FABMAN_BATCH_CONCURRENCY, FABMAN_RATE_LIMIT)
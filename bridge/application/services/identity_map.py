@@ -0,0 +1,108 @@
+from typing import Any, Dict, Union
+from urllib.parse import urlsplit
+
+from flask import g, has_request_context
+
+from application.services.metrics import metrics
+from application.services.serialization import loads
+
+
+def resource_key(url: str) -> str:
+    """
+    Key of Fabman resource, URLs differing only by trailing slash are the same resource.
+    :param url: API URL
+    :return: key
+    """
+
+    path, _, query = url.partition("?")
+    path = path.rstrip("/")
+
+    return f'{path}?{query}' if query else path
+
+
+def _entries() -> Union[Dict[str, bytes], None]:
+    if not has_request_context():
+        return None
+
+    if "fabman_reads" not in g:
+        g.fabman_reads = {}
+
+    return g.fabman_reads
+
+
+def get(url: str) -> Any:
+    """
+    Resource already fetched during current request, every call returns new copy, so callers can modify it.
+    :param url: API URL
+    :return: data of resource or None
+    """
+
+    entries = _entries()
+    content = entries.get(resource_key(url)) if entries is not None else None
+
+    if content is None:
+        return None
+
+    metrics.incr("identity_map.hit")
+
+    return loads(content)
+
+
+def get_any_variant(url: str) -> Any:
+    """
+    Resource already fetched during current request with any query string (e.g. member fetched with
+    ?embed=trainings), for fields present in every variant of the resource.
+    :param url: API URL (query string is ignored)
+    :return: data of resource or None
+    """
+
+    entries = _entries()
+
+    if not entries:
+        return None
+
+    path = urlsplit(resource_key(url)).path
+    content = next((c for key, c in entries.items() if urlsplit(key).path == path), None)
+
+    if content is None:
+        return None
+
+    metrics.incr("identity_map.hit")
+
+    return loads(content)
+
+
+def put(url: str, content: bytes) -> None:
+    """
+    Remember fetched resource for the rest of current request (no-op outside of request).
+    :param url: API URL
+    :param content: raw JSON response
+    :return: None
+    """
+
+    entries = _entries()
+
+    if entries is not None:
+        entries[resource_key(url)] = content
+
+
+def invalidate(url: str) -> None:
+    """
+    Forget resources affected by write to url: the resource itself, its subresources and its parents
+    (e.g. write to /members/1/trainings invalidates /members/1?embed=trainings).
+    :param url: API URL of written resource
+    :return: None
+    """
+
+    entries = _entries()
+
+    if not entries:
+        return
+
+    path = urlsplit(resource_key(url)).path
+
+    for key in list(entries):
+        key_path = urlsplit(key).path
+
+        if key_path == path or key_path.startswith(f'{path}/') or path.startswith(f'{key_path}/'):
+            del entries[key]
@@ -0,0 +1,137 @@
+import time
+from contextlib import contextmanager
+from threading import Condition
+from typing import Dict
+
+from flask import has_request_context, request
+
+from application.services.metrics import metrics
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# lane of Fabman calls made by route, other routes are interactive, calls outside of request (background tasks,
+# workers of batch endpoint) are batch
+ROUTE_LANES: Dict[str, str] = {
+    "main.training_expiration": BATCH,
+    "main.get_available_trainings_batch": BATCH
+}
+
+
+class LaneTimeout(Exception):
+    """No free slot of lane before timeout."""
+
+
+def current_lane() -> str:
+    """
+    Priority lane of Fabman call by its originating route.
+    :return: "interactive" or "batch"
+    """
+
+    if not has_request_context():
+        return BATCH
+
+    return ROUTE_LANES.get(request.endpoint, INTERACTIVE)
+
+
+class PriorityLanes:
+    """
+    Shared concurrency (and optional rate) budget of outbound calls with two priority lanes. Interactive calls take any
+    free slot, batch calls get only leftover capacity: at most batch_concurrency slots and only while no interactive
+    call is waiting. Rate budget is token bucket with burst of one second of calls, 0 disables it.
+    """
+
+    def __init__(self, name: str, concurrency: int, batch_concurrency: int, rate: float = 0):
+        self.name = name
+        self.concurrency = concurrency
+        self.batch_concurrency = min(batch_concurrency, concurrency)
+        self.rate = rate
+        self.active = {INTERACTIVE: 0, BATCH: 0}
+        self.waiting = {INTERACTIVE: 0, BATCH: 0}
+        self._tokens = max(rate, 1)
+        self._refilled = time.monotonic()
+        self._condition = Condition()
+
+    def _refill(self) -> float:
+        """
+        Refill token bucket, return seconds until the next token (0 if a token is available).
+        """
+
+        if not self.rate:
+            return 0
+
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._refilled) * self.rate, max(self.rate, 1))
+        self._refilled = now
+
+        return 0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def _wait_time(self, lane: str) -> float | None:
+        """
+        Seconds until call of lane may run (0 - now, None - until another call finishes).
+        """
+
+        if sum(self.active.values()) >= self.concurrency:
+            return None
+
+        if lane == BATCH and (self.waiting[INTERACTIVE] or self.active[BATCH] >= self.batch_concurrency):
+            return None
+
+        return self._refill()
+
+    @contextmanager
+    def slot(self, lane: str, timeout: float):
+        """
+        Hold slot of lane for the block, wait for it at most timeout seconds.
+        :param lane: "interactive" or "batch"
+        :param timeout: max seconds of waiting
+        :raises LaneTimeout: slot wasn't free before timeout
+        :return: seconds of waiting in queue
+        """
+
+        if not self.concurrency:
+            yield 0
+
+            return
+
+        start = time.monotonic()
+        until = start + timeout
+
+        with self._condition:
+            self.waiting[lane] += 1
+
+            try:
+                while (wait := self._wait_time(lane)) != 0:
+                    left = until - time.monotonic()
+
+                    if left <= 0:
+                        metrics.incr(f'{self.name}.lane.{lane}.timeout')
+
+                        raise LaneTimeout(f'No free {lane} slot in {round(timeout, 3)} s')
+
+                    self._condition.wait(left if wait is None else min(wait, left))
+
+            finally:
+                self.waiting[lane] -= 1
+
+                if lane == INTERACTIVE and not self.waiting[INTERACTIVE]:
+                    self._condition.notify_all()
+
+            if self.rate:
+                self._tokens -= 1
+
+            self.active[lane] += 1
+            metrics.set(f'{self.name}.lane.{lane}.active', self.active[lane])
+
+        delay = round(time.monotonic() - start, 3)
+        metrics.observe(f'{self.name}.lane.{lane}.queue_delay', delay)
+
+        try:
+            yield delay
+
+        finally:
+            with self._condition:
+                self.active[lane] -= 1
+                metrics.set(f'{self.name}.lane.{lane}.active', self.active[lane])
+                self._condition.notify_all()
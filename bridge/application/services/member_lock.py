@@ -0,0 +1,120 @@
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from application.configs.config import MEMBER_LOCK_DIR, MEMBER_LOCK_TIMEOUT
+from application.services.error_handlers import CustomError
+from application.services.metrics import metrics
+from application.services.deadline import call_timeout
+
+
+class MemberLocks:
+    """
+    Keyed locks serializing updates of one member, updates of different members run in parallel.
+    Lock is held inside the process (threads) and across worker processes on the node (flock of per-member file
+    in directory, only where fcntl is available).
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, directory: str = None, timeout: float = 30):
+        self.directory = directory
+        self.timeout = timeout
+        self._locks: Dict[str, List] = {}
+        self._guard = Lock()
+
+        if directory and fcntl:
+            os.makedirs(directory, exist_ok=True)
+
+    def _acquire_local(self, key: str) -> Lock:
+        with self._guard:
+            entry = self._locks.setdefault(key, [Lock(), 0])
+            entry[1] += 1
+
+        return entry[0]
+
+    def _release_local(self, key: str) -> None:
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+
+            if not entry[1]:
+                del self._locks[key]
+
+    @contextmanager
+    def lock(self, member_id: int | str):
+        """
+        Hold exclusive lock of member for the block.
+        :param member_id: ID of member in Fabman DB
+        :raises Member is locked: lock wasn't acquired before timeout (or request deadline)
+        :return: None
+        """
+
+        key = str(member_id)
+        timeout = call_timeout(self.timeout, f'lock of member {key}')
+        start = time.monotonic()
+        local_lock = self._acquire_local(key)
+        fd = None
+
+        try:
+            if not local_lock.acquire(blocking=False):
+                metrics.incr("member_lock.contended")
+
+                if not local_lock.acquire(timeout=timeout):
+                    self._timeout(key)
+
+            try:
+                fd = self._acquire_file(key, start + timeout)
+                metrics.observe("member_lock.wait", round(time.monotonic() - start, 3))
+
+                yield
+
+            finally:
+                if fd is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+
+                local_lock.release()
+
+        finally:
+            self._release_local(key)
+
+    def _acquire_file(self, key: str, until: float) -> int | None:
+        if not self.directory or not fcntl:
+            return None
+
+        fd = os.open(os.path.join(self.directory, f'member-{key}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        contended = False
+
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+                return fd
+
+            except BlockingIOError:
+                if not contended:
+                    contended = True
+                    metrics.incr("member_lock.contended_workers")
+
+                if time.monotonic() >= until:
+                    os.close(fd)
+                    self._timeout(key)
+
+                time.sleep(self.POLL_INTERVAL)
+
+    @staticmethod
+    def _timeout(key: str) -> None:
+        metrics.incr("member_lock.timeout")
+
+        raise CustomError("Member is locked by another request", f'Member ID: {key}')
+
+
+member_locks = MemberLocks(MEMBER_LOCK_DIR, MEMBER_LOCK_TIMEOUT)
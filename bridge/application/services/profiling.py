@@ -0,0 +1,158 @@
+import cProfile
+import hmac
+import os
+import random
+import sys
+import time
+from collections import Counter
+from threading import Event, Lock, Thread, get_ident
+
+from flask import Flask, Response, request
+
+from application.configs.config import PROFILE_DIR, PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_MAX_FILES,\
+    PROFILE_STACK_INTERVAL
+from application.services.metrics import metrics
+from application.services.tracing import normalize_path
+
+
+class StackSampler:
+    """
+    Samples call stack of one thread every interval seconds, result is in collapsed-stack format for flamegraphs.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+
+            while frame:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of single requests, enabled by PROFILE_DIR. Request is profiled when it has X-Profile-Token header
+    matching PROFILE_TOKEN or when it's sampled (1 of PROFILE_SAMPLE_RATE requests). Every profiled request writes
+    cProfile stats (.prof) and sampled call stacks in collapsed format (.collapsed) to PROFILE_DIR, only the newest
+    max_files profiles are kept. Only one request per process is profiled at a time.
+    """
+
+    def __init__(self, directory: str = None, token: str = None, sample_rate: int = 0, max_files: int = 50,
+                 stack_interval: float = 0.005):
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.stack_interval = stack_interval
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and bool(self.token or self.sample_rate)
+
+    def init_app(self, app: Flask) -> None:
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._add_header)
+        app.teardown_request(self._stop)
+
+    def _requested(self) -> bool:
+        token = request.headers.get("X-Profile-Token")
+
+        if token and self.token:
+            return hmac.compare_digest(token, self.token)
+
+        return bool(self.sample_rate) and random.random() * self.sample_rate < 1
+
+    def _start(self) -> None:
+        if not self._requested() or not self._lock.acquire(blocking=False):
+            return
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(get_ident(), self.stack_interval)
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}'\
+               f'{normalize_path(request.path).replace("/", "_").replace("{id}", "id")}-{os.urandom(2).hex()}'
+        request.environ["bridge.profile"] = (name, profiler, sampler, time.perf_counter())
+        sampler.start()
+        profiler.enable()
+
+    def _add_header(self, response: Response) -> Response:
+        profile = request.environ.get("bridge.profile")
+
+        if profile:
+            response.headers["X-Profile"] = profile[0]
+
+        return response
+
+    def _stop(self, exc: BaseException = None) -> None:
+        profile = request.environ.pop("bridge.profile", None)
+
+        if not profile:
+            return
+
+        name, profiler, sampler, start = profile
+
+        try:
+            profiler.disable()
+            sampler.stop()
+            self._write(name, profiler, sampler)
+            metrics.incr("profiling.profiles")
+            metrics.observe("profiling.request_duration", round(time.perf_counter() - start, 3))
+
+        finally:
+            self._lock.release()
+
+    def _write(self, name: str, profiler: cProfile.Profile, sampler: StackSampler) -> None:
+        path = os.path.join(self.directory, name)
+        profiler.dump_stats(f'{path}.prof')
+
+        with open(f'{path}.collapsed', "w") as f:
+            f.write(sampler.collapsed())
+
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        profiles = sorted(
+            (e for e in os.scandir(self.directory) if e.name.endswith(".prof")),
+            key=lambda e: e.stat().st_mtime
+        )
+
+        for entry in profiles[:max(len(profiles) - self.max_files, 0)]:
+            for suffix in (".prof", ".collapsed"):
+                self._remove(f'{entry.path[:-len(".prof")]}{suffix}')
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+
+        except FileNotFoundError:
+            pass
+
+
+profiler = RequestProfiler(PROFILE_DIR, PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_MAX_FILES, PROFILE_STACK_INTERVAL)
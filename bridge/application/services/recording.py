@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import time
+from threading import Lock
+from typing import Any, Dict
+
+import requests
+from flask import Flask, Response, g, has_request_context, request
+
+from application.configs.config import FABMAN_API_URL, RECORD_PATH
+
+
+# values of these keys (ClassMarker results and Fabman members) are replaced by pseudonyms in recordings
+PII_KEYS = {
+    "first", "last", "email", "ip_address", "extra_info_answer", "access_code_used", "certificate_url",
+    "certificate_serial", "view_results_url", "feedback", "emailAddress", "firstName", "lastName", "company", "phone",
+    "address", "address2", "city", "zip", "countryCode", "region", "dateOfBirth", "gender", "billingFirstName",
+    "billingLastName", "billingCompany", "billingAddress", "billingAddress2", "billingCity", "billingZip",
+    "billingCountryCode", "billingRegion", "billingEmailAddress", "billingInvoiceText", "taxExempt", "hasBillingAddress"
+}
+RECORDED_ENDPOINTS = {"main.add_classmarker_training"}
+
+
+class TrafficRecorder:
+    """
+    Records ClassMarker webhooks with the Fabman calls they made and their responses as JSON lines, input of
+    benchmarks.webhook_replay. Personal data are replaced by pseudonyms (salted hash, stable within one process), the
+    encrypted cm_user_id is replaced by decrypted "<member_id>-<training_id>" identifiers.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._salt = os.urandom(16)
+        self._lock = Lock()
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def init_app(self, app: Flask) -> None:
+        if not self.enabled:
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def scrub(self, data: Any) -> Any:
+        """
+        Copy of data with pseudonyms instead of personal data.
+        :param data: JSON-like data
+        :return: scrubbed data
+        """
+
+        if isinstance(data, dict):
+            return {k: self._pseudonym(k, v) if k in PII_KEYS and v else self.scrub(v) for k, v in data.items()}
+
+        if isinstance(data, list):
+            return [self.scrub(i) for i in data]
+
+        return data
+
+    def _pseudonym(self, key: str, value: Any) -> str:
+        token = hashlib.sha256(self._salt + f'{key}:{value}'.encode()).hexdigest()[:10]
+
+        return f'{token}@example.invalid' if "email" in key.lower() else f'{key}-{token}'
+
+    def _start(self) -> None:
+        if request.endpoint in RECORDED_ENDPOINTS:
+            g.recording = {"time": round(time.time(), 3), "start": time.perf_counter(), "fabman": []}
+
+    def record_call(self, method: str, url: str, body: Any, res: requests.Response) -> None:
+        """
+        Add Fabman call to recording of current request (no-op if the request is not recorded).
+        :param method: HTTP method
+        :param url: API URL
+        :param body: JSON or form data of request
+        :param res: Fabman response
+        :return: None
+        """
+
+        recording = g.get("recording") if has_request_context() else None
+
+        if recording is None:
+            return
+
+        try:
+            response = res.json()
+
+        except ValueError:
+            response = res.text
+
+        recording["fabman"].append({
+            "method": method,
+            "path": url.replace(FABMAN_API_URL, ""),
+            "request": self.scrub(body),
+            "status": res.status_code,
+            "response": self.scrub(response)
+        })
+
+    def _finish(self, response: Response) -> Response:
+        from application.services.tools import decrypt_identifiers
+
+        recording = g.pop("recording", None)
+
+        if recording is None:
+            return response
+
+        payload = self.scrub(request.get_json(silent=True) or {})
+        result = payload.get("result") or {}
+
+        try:
+            recording["identifiers"] = decrypt_identifiers(result.get("cm_user_id"))
+
+        except Exception:
+            recording["identifiers"] = None
+
+        result.pop("cm_user_id", None)
+        self.write({
+            "time": recording["time"],
+            "duration": round(time.perf_counter() - recording["start"], 4),
+            "payload": payload,
+            "identifiers": recording["identifiers"],
+            "response": {"status": response.status_code, "body": response.get_data(as_text=True)},
+            "fabman": recording["fabman"]
+        })
+
+        return response
+
+    def write(self, entry: Dict) -> None:
+        line = json.dumps(entry, default=str)
+
+        with self._lock:
+            if not self._file:
+                self._file = open(self.path, "a", buffering=1)
+
+            self._file.write(f'{line}\n')
+
+
+recorder = TrafficRecorder(RECORD_PATH)
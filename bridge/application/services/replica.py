@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from threading import local
+from typing import Dict, List, Union
+
+from application.configs.config import READ_REPLICA_PATH, READ_REPLICA_MAX_STALENESS, READ_REPLICA_RECONCILE_INTERVAL
+from application.services.metrics import metrics
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS members (id INTEGER PRIMARY KEY, data TEXT NOT NULL, synced_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS training_courses (id INTEGER PRIMARY KEY, position INTEGER NOT NULL, "
+    "for_members INTEGER NOT NULL, data TEXT NOT NULL, synced_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, synced_at REAL NOT NULL)"
+]
+
+
+class ReadReplica:
+    """
+    Local SQLite copy of Fabman members (with embedded trainings and privileges) and training-courses catalog.
+    Replica is shared by all worker processes on the node (WAL mode), every thread uses its own connection.
+    Rows older than max_staleness seconds are ignored and read endpoints fall back to live Fabman API. Rows of bulk
+    sync are stamped by start of the sync, so max_staleness must outlast reconcile interval (default is two intervals,
+    one missed reconcile is tolerated), member rows are restamped whenever Fabman webhook syncs the member.
+    """
+
+    def __init__(self, path: str = None, max_staleness: float = 7200, reconcile_interval: float = 3600):
+        self.path = path
+        self.max_staleness = max_staleness
+        self.reconcile_interval = reconcile_interval
+        self._local = local()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def init_app(self, app) -> None:
+        if self.enabled and self.max_staleness < self.reconcile_interval:
+            print(
+                f'WARNING: READ_REPLICA_MAX_STALENESS ({self.max_staleness:g} s) is shorter than '
+                f'READ_REPLICA_RECONCILE_INTERVAL ({self.reconcile_interval:g} s), replica goes stale between syncs'
+            )
+
+        if self.enabled:
+            with self.transaction() as conn:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+
+        if not conn:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield conn
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("COMMIT")
+
+    def _fresh(self, synced_at: float) -> bool:
+        return time.time() - synced_at <= self.max_staleness
+
+    def get_member(self, member_id: int | str, allow_stale: bool = False) -> Union[Dict, None]:
+        """
+        Get replicated member data, None if member is missing or stale.
+        :param member_id: ID of member in Fabman DB
+        :param allow_stale: return also stale data (fallback when Fabman is unavailable)
+        :return: member data in shape of /members/{id}?embed=trainings&embed=privileges response
+        """
+
+        row = self.connection().execute("SELECT data, synced_at FROM members WHERE id = ?", (member_id,)).fetchone()
+
+        if not row or not (allow_stale or self._fresh(row[1])):
+            metrics.incr("replica.member.miss" if not row else "replica.member.stale")
+
+            return None
+
+        metrics.incr("replica.member.hit")
+
+        return json.loads(row[0])
+
+    def put_member(self, member_data: Dict, synced_at: float = None) -> None:
+        self.connection().execute(
+            "INSERT OR REPLACE INTO members (id, data, synced_at) VALUES (?, ?, ?)",
+            (member_data["id"], json.dumps(member_data), synced_at or time.time())
+        )
+
+    def put_members(self, members: List[Dict], synced_at: float) -> None:
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO members (id, data, synced_at) VALUES (?, ?, ?)",
+                [(m["id"], json.dumps(m), synced_at) for m in members]
+            )
+
+    def delete_member(self, member_id: int | str) -> None:
+        self.connection().execute("DELETE FROM members WHERE id = ?", (member_id,))
+
+    def delete_members_synced_before(self, synced_at: float) -> None:
+        """Remove members which were not part of the last bulk sync (deleted in Fabman)."""
+        self.connection().execute("DELETE FROM members WHERE synced_at < ?", (synced_at,))
+
+    def get_training_courses(self, for_members: bool = True, allow_stale: bool = False) -> Union[List[Dict], None]:
+        """
+        Get replicated training-courses catalog, None if catalog was never synced or it's stale.
+        :param for_members: True for catalog available for members (?q=for_members), False for admins catalog
+        :param allow_stale: return also stale catalog (fallback when Fabman is unavailable)
+        :return: list of training-courses
+        """
+
+        if not self._catalog_fresh(allow_stale):
+            return None
+
+        query = "SELECT data FROM training_courses"
+
+        if for_members:
+            query += " WHERE for_members = 1"
+
+        rows = self.connection().execute(f'{query} ORDER BY position').fetchall()
+
+        return [json.loads(r[0]) for r in rows]
+
+    def get_training_course(self, training_id: int | str, allow_stale: bool = False) -> Union[Dict, None]:
+        if not self._catalog_fresh(allow_stale):
+            return None
+
+        row = self.connection().execute("SELECT data FROM training_courses WHERE id = ?", (training_id,)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def put_training_courses(self, courses: List[Dict], for_members_ids: set, synced_at: float) -> None:
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM training_courses")
+            conn.executemany(
+                "INSERT INTO training_courses (id, position, for_members, data, synced_at) VALUES (?, ?, ?, ?, ?)",
+                [(c["id"], i, c["id"] in for_members_ids, json.dumps(c), synced_at) for i, c in enumerate(courses)]
+            )
+            self._set_synced_at(conn, "training_courses", synced_at)
+
+    def _catalog_fresh(self, allow_stale: bool = False) -> bool:
+        synced_at = self.get_synced_at("training_courses")
+        fresh = bool(synced_at and (allow_stale or self._fresh(synced_at)))
+        metrics.incr("replica.catalog.hit" if fresh else "replica.catalog.miss")
+
+        return fresh
+
+    def get_synced_at(self, name: str) -> Union[float, None]:
+        row = self.connection().execute("SELECT synced_at FROM sync_state WHERE name = ?", (name,)).fetchone()
+
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_synced_at(conn: sqlite3.Connection, name: str, synced_at: float) -> None:
+        conn.execute("INSERT OR REPLACE INTO sync_state (name, synced_at) VALUES (?, ?)", (name, synced_at))
+
+    def claim(self, name: str, interval: float) -> bool:
+        """
+        Atomically claim periodic job, so only one worker process runs it per interval.
+        :param name: name of the job
+        :param interval: minimal seconds between two runs
+        :return: bool - current process should run the job
+        """
+
+        now = time.time()
+
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO sync_state (name, synced_at) VALUES (?, 0)", (name,))
+            claimed = conn.execute(
+                "UPDATE sync_state SET synced_at = ? WHERE name = ? AND synced_at <= ?",
+                (now, name, now - interval)
+            ).rowcount
+
+        return bool(claimed)
+
+
+replica = ReadReplica(READ_REPLICA_PATH, READ_REPLICA_MAX_STALENESS, READ_REPLICA_RECONCILE_INTERVAL)
@@ -0,0 +1,134 @@
+import gzip
+import json
+from typing import Any
+
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from application.configs.config import JSON_SERIALIZER, COMPRESS_MIN_SIZE, COMPRESS_LEVEL
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+
+except ImportError:
+    brotli = None
+
+
+USE_ORJSON = orjson is not None and JSON_SERIALIZER == "orjson"
+COMPRESSIBLE_MIMETYPES = ["application/json", "application/x-ndjson", "text/html", "text/plain"]
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serialize response data with configured JSON serializer.
+    :param data: JSON serializable data
+    :return: UTF-8 encoded JSON
+    """
+
+    if USE_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    return json.dumps(data).encode()
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Deserialize JSON with configured JSON serializer.
+    :param data: JSON document
+    :return: deserialized data
+    """
+
+    if USE_ORJSON:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider (jsonify, request.json) backed by orjson, if it's available and enabled.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if not USE_ORJSON or kwargs.get("cls"):
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if not USE_ORJSON or kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress response body.
+    :param data: raw response body
+    :param encoding: "br" or "gzip"
+    :return: compressed body
+    """
+
+    if encoding == "br":
+        return brotli.compress(data, quality=min(COMPRESS_LEVEL, 11))
+
+    return gzip.compress(data, compresslevel=min(COMPRESS_LEVEL, 9))
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress response body with encoding negotiated by Accept-Encoding header, if it's large enough.
+    """
+
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    if (response.content_length or 0) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli else ["gzip"])
+
+    if not encoding:
+        return response
+
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+
+    etag, weak = response.get_etag()
+
+    if etag:
+        # encoded representation needs its own strong ETag
+        response.set_etag(f'{etag}-{encoding}', weak)
+
+    return response
+
+
+def register_serialization(app: Flask) -> None:
+    """Register fast JSON provider and response compression."""
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+
+    return None
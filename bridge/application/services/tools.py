@@ -1,11 +1,14 @@
+import hashlib
 from datetime import datetime
-from flask import session, Response
-import json
+from flask import session, Response, request, g
 from cryptography.fernet import Fernet
 from functools import wraps
 from typing import Dict, List, Union, Tuple
 from application.configs.config import TRACK_TIME, FERNET_KEY
 from application.services.error_handlers import CustomError
+from application.services.serialization import dumps
+from application.services.deadline import budget_report
+from application.services.expiration import date_ordinal
 
 
 def expired_date(dt: str, date: bool = True) -> bool:
@@ -15,12 +18,10 @@ def expired_date(dt: str, date: bool = True) -> bool:
     :param date: True if function should compare dates, False for comparing datetimes
     :return: bool - provided date is expired
     """
-    dt = datetime(*[int(i) for i in dt.split("-")])
-
     if date:
-        return dt.date() < datetime.now().date()
+        return date_ordinal(dt) < datetime.now().toordinal()
 
-    return dt < datetime.now()
+    return datetime(*[int(i) for i in dt.split("-")]) < datetime.now()
 
 
 def get_member_training(training_id: int, member_trainings: List[Dict]) -> Union[Dict, None]:
@@ -65,6 +66,40 @@ def decrypt_identifiers(crypto: str) -> str:
     return identifiers
 
 
+def etag_for(*parts) -> str:
+    """
+    Strong ETag derived from response inputs (versions, IDs, ...) instead of response content.
+    :param parts: values which fully determine response body
+    :return: ETag value
+    """
+
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def etag_matches(etag: str) -> bool:
+    """
+    Check If-None-Match header of current request against ETag (also against its compressed variants).
+    :param etag: ETag value of current response
+    :return: bool - client's copy is still valid
+    """
+
+    if_none_match = request.if_none_match
+
+    return any(if_none_match.contains(e) for e in (etag, f'{etag}-gzip', f'{etag}-br'))
+
+
+def conditional_etag(*parts) -> bool:
+    """
+    Set derived ETag of current response, so the response body doesn't have to be built for cached clients.
+    :param parts: values which fully determine response body
+    :return: bool - client's copy is still valid and 304 response should be returned
+    """
+
+    g.etag = etag_for(*parts)
+
+    return etag_matches(g.etag)
+
+
 def track_api_time(f):
     @wraps(f)
     def decorator(*args, **kwargs):
@@ -75,15 +110,25 @@ def track_api_time(f):
         session.setdefault("railway_processes_duration", round(stop - start - sum(session.values()), 3))
         session.setdefault("total", round(sum(session.values()), 3))
 
-        headers = {"Content-Type": "application/json"}
+        response = res if isinstance(res, Response) else Response(dumps(res), 200, mimetype="application/json")
+        etag = g.get("etag")
+
+        if not etag and response.status_code == 200 and response.mimetype == "application/json"\
+                and not response.is_streamed:
+            etag = hashlib.sha256(response.get_data()).hexdigest()
+
+            if etag_matches(etag):
+                response = Response(status=304)
+
+        if etag and (response.status_code == 304 or response.mimetype == "application/json"):
+            response.set_etag(etag)
+
+        if g.get("stale_data"):
+            response.headers["X-Stale-Data"] = "true"
 
         if TRACK_TIME:
-            headers["Durations"] = dict(session)
+            response.headers["Durations"] = str({**dict(session), **budget_report()})
 
-        return (
-            res if isinstance(res, Response) else json.dumps(res),
-            200,
-            headers
-        )
+        return response
 
     return decorator
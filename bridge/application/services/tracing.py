@@ -0,0 +1,183 @@
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Union
+
+from flask import Flask, Response, request
+
+from application.configs.config import TRACE_EXPORT_PATH
+
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+IDS = re.compile(r"/\d+")
+
+_current_span: ContextVar[Union["Span", None]] = ContextVar("current_span", default=None)
+
+
+def normalize_path(path: str) -> str:
+    """
+    Path without query string and with IDs replaced, used as low-cardinality span name.
+    :param path: URL path, e.g. /members/123/trainings/4?embed=trainings
+    :return: normalized path, e.g. /members/{id}/trainings/{id}
+    """
+
+    return IDS.sub("/{id}", path.split("?")[0].rstrip("/"))
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, sampled: bool = True, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-{"01" if self.sampled else "00"}'
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    Lightweight tracing with W3C trace context (traceparent header) propagation.
+    Finished spans are appended as JSON lines to export file, tracing is disabled when export path is not set.
+    """
+
+    def __init__(self, export_path: str = None):
+        self.export_path = export_path
+        self._lock = Lock()
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.export_path)
+
+    def init_app(self, app: Flask) -> None:
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def current() -> Union[Span, None]:
+        return _current_span.get()
+
+    def current_traceparent(self) -> Union[str, None]:
+        span = self.current()
+
+        return span.traceparent if span else None
+
+    @contextmanager
+    def span(self, name: str, traceparent: str = None, **attributes):
+        """
+        Record span, child of current span (or of remote parent from traceparent header).
+        :param name: name of span
+        :param traceparent: traceparent of remote parent span
+        :param attributes: span attributes
+        :return: span, or None if tracing is disabled
+        """
+
+        if not self.enabled:
+            yield None
+
+            return
+
+        span = self._new_span(name, traceparent, **attributes)
+        token = _current_span.set(span)
+
+        try:
+            yield span
+
+        except Exception as e:
+            span.status = f'error: {e.__class__.__name__}'
+            raise
+
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _new_span(self, name: str, traceparent: str = None, **attributes) -> Span:
+        parent = self.current()
+        remote = TRACEPARENT.match(traceparent or "")
+
+        if remote:
+            return Span(name, remote.group(1), remote.group(2), remote.group(3) == "01", **attributes)
+
+        if parent:
+            return Span(name, parent.trace_id, parent.span_id, parent.sampled, **attributes)
+
+        return Span(name, os.urandom(16).hex(), **attributes)
+
+    def _finish(self, span: Span) -> None:
+        span.duration = round(time.perf_counter() - span._start, 6)
+
+        if span.sampled:
+            self.export(span.to_dict())
+
+    def export(self, span: Dict) -> None:
+        line = json.dumps(span, default=str)
+
+        with self._lock:
+            if not self._file:
+                self._file = open(self.export_path, "a", buffering=1)
+
+            self._file.write(f'{line}\n')
+
+    def _start_request(self) -> None:
+        span = self._new_span(
+            f'{request.method} {request.url_rule.rule if request.url_rule else normalize_path(request.path)}',
+            request.headers.get("traceparent"),
+            kind="server",
+            path=request.path
+        )
+        request.environ["bridge.span"] = (span, _current_span.set(span))
+
+    def _finish_request(self, response: Response) -> Response:
+        span = request.environ.get("bridge.span", (None,))[0]
+
+        if span:
+            span.set(status_code=response.status_code)
+            response.headers["traceparent"] = span.traceparent
+
+        return response
+
+    def _teardown_request(self, exc: BaseException = None) -> None:
+        span, token = request.environ.pop("bridge.span", (None, None))
+
+        if not span:
+            return
+
+        if exc:
+            span.status = f'error: {exc.__class__.__name__}'
+
+        _current_span.reset(token)
+        self._finish(span)
+
+
+tracer = Tracer(TRACE_EXPORT_PATH)
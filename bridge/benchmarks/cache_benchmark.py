@@ -0,0 +1,83 @@
+"""
+Hit ratio and lookup latency of per-process (memory) and shared (sqlite) cache backends with several worker processes.
+Run from bridge directory: python -m benchmarks.cache_benchmark [--workers 4] [--lookups 5000] [--keys 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from multiprocessing import Pool
+
+from application.services.cache import FabmanCache, MemoryCacheBackend, SQLiteCacheBackend
+
+
+def catalog_payload(key: int):
+    return [{"id": i, "title": f'Course {key}-{i}', "notes": "for_web", "metadata": {"courses_cm": {
+        "cm_url": f'https://www.classmarker.com/online-test/start/?quiz={i}'}}} for i in range(50)]
+
+
+def run_worker(args):
+    backend_name, path, lookups, keys, seed = args
+    backend = SQLiteCacheBackend(path) if backend_name == "sqlite" else MemoryCacheBackend()
+    cache = FabmanCache(ttl=3600, max_stale=0, backend=backend)
+    rng = random.Random(seed)
+    loads = 0
+    latencies = []
+
+    def loader(k):
+        nonlocal loads
+        loads += 1
+
+        return catalog_payload(k)
+
+    for _ in range(lookups):
+        key = min(int(rng.paretovariate(1.2)) - 1, keys - 1)
+        start = time.perf_counter()
+        cache.get(f'key-{key}', lambda: loader(key))
+        latencies.append(time.perf_counter() - start)
+
+    return loads, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=50)
+    args = parser.parse_args()
+
+    print("BACKEND;WORKERS;LOOKUPS;UPSTREAM_LOADS;HIT_RATIO;MEAN_US;P50_US;P99_US")
+
+    for backend_name in ("memory", "sqlite"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+
+            if backend_name == "sqlite":
+                SQLiteCacheBackend(path)
+
+            with Pool(args.workers) as pool:
+                results = pool.map(
+                    run_worker,
+                    [(backend_name, path, args.lookups, args.keys, seed) for seed in range(args.workers)]
+                )
+
+        loads = sum(r[0] for r in results)
+        latencies = sorted(latency * 1_000_000 for r in results for latency in r[1])
+        total = len(latencies)
+
+        print(";".join(str(v) for v in [
+            backend_name,
+            args.workers,
+            total,
+            loads,
+            round(1 - loads / total, 4),
+            round(statistics.mean(latencies), 1),
+            round(latencies[total // 2], 1),
+            round(latencies[int(total * 0.99)], 1)
+        ]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Per-email render cost: Flask render_template vs compiled EmailRenderer (memoized and not memoized bodies).
+Every email has its own training URL (member ID and key), as emails of scheduler run.
+Run from bridge directory: python -m benchmarks.email_benchmark [--emails 1000] [--courses 5]
+"""
+import argparse
+import hashlib
+import time
+
+from flask import render_template
+
+from application import create_app
+from application.services.emails import EmailRenderer
+
+
+def training_url(member_id: int) -> str:
+    key = hashlib.sha512(f'{member_id}private-key'.encode()).hexdigest()
+
+    return f'https://skoleni.fablabbrno.cz?id={member_id}&key={key}'
+
+
+def measure(render, emails: int, courses: int) -> float:
+    urls = [training_url(i) for i in range(emails)]
+    start = time.perf_counter()
+
+    for i in range(emails):
+        render("training_expiration.html", {"training_url": urls[i]}, training_title=f'Course {i % courses}')
+
+    return (time.perf_counter() - start) / emails * 1_000_000
+
+
+def render_template_fn(template: str, recipient_context: dict, **context) -> str:
+    return render_template(template, **context, **recipient_context)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    memoized = EmailRenderer()
+    memoized.init_app(app)
+    compiled_only = EmailRenderer(max_cached=0)
+    compiled_only.init_app(app)
+
+    print("RENDERER;US_PER_EMAIL")
+
+    with app.test_request_context():
+        print(f'render_template;{round(measure(render_template_fn, args.emails, args.courses), 2)}')
+
+    print(f'compiled;{round(measure(compiled_only.render, args.emails, args.courses), 2)}')
+    print(f'compiled_memoized;{round(measure(memoized.render, args.emails, args.courses), 2)}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Expiration evaluation of many trainings: per-item expired_date (legacy: parse and datetime.now() per training) vs
+ExpirationEngine (today taken once, cached date parsing) and ExpirationIndex range queries.
+Run from bridge directory: python -m benchmarks.expiration_benchmark [--trainings 100000] [--repeat 5]
+"""
+import argparse
+import random
+import timeit
+from datetime import date, datetime, timedelta
+
+from application.services.expiration import ExpirationEngine, ExpirationIndex
+from application.services.tools import expired_date
+
+
+def legacy_expired_date(dt: str) -> bool:
+    """expired_date before ExpirationEngine: date parsed by splitting and datetime.now() for every training"""
+    return datetime(*[int(i) for i in dt.split("-")]).date() < datetime.now().date()
+
+
+def make_trainings(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    today = date.today()
+
+    return [
+        {
+            "id": i,
+            "untilDate": (today + timedelta(days=rng.randint(-730, 730))).isoformat() if rng.random() < 0.8 else None
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trainings", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    trainings = make_trainings(args.trainings)
+    untils = [t["untilDate"] for t in trainings]
+
+    def per_item_legacy():
+        return [(legacy_expired_date(t["untilDate"]) if t["untilDate"] else False) for t in trainings]
+
+    def per_item():
+        return [(expired_date(t["untilDate"]) if t["untilDate"] else False) for t in trainings]
+
+    def engine_scalar():
+        engine = ExpirationEngine()
+
+        return [engine.is_expired(u) for u in untils]
+
+    def engine_batch():
+        return ExpirationEngine().expired_mask(untils)
+
+    def index_build():
+        return ExpirationIndex((t["untilDate"], t["id"]) for t in trainings)
+
+    assert per_item_legacy() == per_item() == engine_scalar() == engine_batch()
+
+    index = index_build()
+    engine = ExpirationEngine()
+    assert len(index.expiring_within(30)) == sum(engine.expires_within(u, 30) for u in untils)
+
+    cases = [
+        ("per_item_legacy", per_item_legacy),
+        ("per_item_expired_date", per_item),
+        ("engine_scalar", engine_scalar),
+        ("engine_batch", engine_batch),
+        ("index_build", index_build),
+        ("index_expiring_within_30_days", lambda: index.expiring_within(30)),
+        ("scan_expiring_within_30_days", lambda: [u for u in untils if engine.expires_within(u, 30)])
+    ]
+
+    print("CASE;TRAININGS;MS;NS_PER_TRAINING")
+
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f'{name};{args.trainings};{round(seconds * 1000, 2)};{round(seconds / args.trainings * 1e9, 1)}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Fabman API stand-in answering from recording of webhook traffic (RECORD_PATH of bridge), used by webhook_replay.
+Responses of every method and path are returned in recorded order, the last one is repeated when they run out.
+Run from bridge directory: python -m benchmarks.fabman_standin recording.jsonl [--port 8100]
+"""
+import argparse
+import json
+from collections import Counter, defaultdict, deque
+from threading import Lock, Thread
+from typing import Dict, List, Tuple
+
+from flask import Flask, Response, request
+from werkzeug.serving import make_server
+
+
+PREFIX = "/api/v1"
+
+
+def load_recording(path: str) -> List[Dict]:
+    with open(path) as f:
+        return sorted((json.loads(line) for line in f if line.strip()), key=lambda e: e["time"])
+
+
+class FabmanStandIn:
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        self.writes = Counter()
+        self.unknown = Counter()
+        self._responses: Dict[Tuple[str, str], deque] = {}
+        self._last: Dict[Tuple[str, str], Dict] = {}
+        self._lock = Lock()
+        self.app = Flask("fabman_standin")
+        self.app.add_url_rule(f'{PREFIX}/<path:path>', "fabman", self.handle, methods=["GET", "POST", "PUT", "DELETE"])
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Start serving recorded responses from the beginning, forget received writes.
+        """
+
+        responses = defaultdict(deque)
+
+        for entry in self.entries:
+            for call in entry["fabman"]:
+                responses[(call["method"], call["path"])].append(call)
+
+        with self._lock:
+            self._responses = dict(responses)
+            self._last = {}
+            self.writes = Counter()
+            self.unknown = Counter()
+
+    def handle(self, path: str) -> Response:
+        key = (request.method, request.full_path.rstrip("?")[len(PREFIX):])
+
+        with self._lock:
+            if request.method != "GET":
+                self.writes[f'{key[0]} {key[1]}'] += 1
+
+            queue = self._responses.get(key)
+
+            if queue:
+                self._last[key] = queue.popleft()
+
+            call = self._last.get(key)
+
+            if call is None:
+                self.unknown[f'{key[0]} {key[1]}'] += 1
+
+                return Response(json.dumps({"error": "not recorded"}), 404, mimetype="application/json")
+
+        body = call["response"]
+
+        return Response(
+            body if isinstance(body, str) else json.dumps(body),
+            call["status"],
+            mimetype="application/json"
+        )
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Serve stand-in in background thread.
+        :return: server (server.server_port is the port)
+        """
+
+        server = make_server(host, port, self.app, threaded=True)
+        Thread(target=server.serve_forever, name="fabman-standin", daemon=True).start()
+
+        return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    standin = FabmanStandIn(load_recording(args.recording))
+    print(f'Fabman stand-in on http://{args.host}:{args.port}{PREFIX} (use it as FABMAN_API_URL of bridge)')
+    make_server(args.host, args.port, standin.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Bytes on the wire and serialization time of /available_trainings-like payloads.
+Run from bridge directory: python -m benchmarks.serialization_benchmark [--courses 100 500 2000] [--repeat 50]
+"""
+import argparse
+import base64
+import gzip
+import os
+import json
+import timeit
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+
+except ImportError:
+    brotli = None
+
+
+def available_trainings_payload(courses: int):
+    def quiz_token() -> str:
+        # Fernet tokens are random, so they are (almost) incompressible
+        return base64.urlsafe_b64encode(os.urandom(75)).decode()
+
+    return [
+        {
+            "id": i,
+            "title": f'Training course {i}',
+            "notes": "for_web for_offline" if i % 3 else "for_offline",
+            "quiz_url": f'https://www.classmarker.com/online-test/start/?quiz=abcdef{i}&cm_user_id={quiz_token()}',
+            "yt_url": f'https://www.youtube.com/watch?v=video{i}',
+            "for_web": bool(i % 3),
+            "for_offline": True,
+            "cs_name": f'Školení {i}',
+            "en_name": f'Training course {i}'
+        } for i in range(courses)
+    ]
+
+
+def measure(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print("COURSES;SERIALIZER;DUMPS_MS;RAW_BYTES;GZIP_BYTES;GZIP_MS;BR_BYTES;BR_MS")
+
+    for courses in args.courses:
+        payload = available_trainings_payload(courses)
+        serializers = {"json": lambda: json.dumps(payload).encode()}
+
+        if orjson:
+            serializers["orjson"] = lambda: orjson.dumps(payload)
+
+        for name, serializer in serializers.items():
+            raw = serializer()
+            gzipped = gzip.compress(raw, compresslevel=6)
+            row = [
+                courses,
+                name,
+                round(measure(serializer, args.repeat), 3),
+                len(raw),
+                len(gzipped),
+                round(measure(lambda: gzip.compress(raw, compresslevel=6), args.repeat), 3)
+            ]
+
+            if brotli:
+                row.extend([
+                    len(brotli.compress(raw, quality=6)),
+                    round(measure(lambda: brotli.compress(raw, quality=6), args.repeat), 3)
+                ])
+
+            else:
+                row.extend(["-", "-"])
+
+            print(";".join(str(r) for r in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time and startup budget of bridge worker (python -X importtime report of application import + create_app).
+Run from bridge directory: python -m benchmarks.startup_benchmark [--runs 5] [--top 15] [--report importtime.txt]
+Exits with status 1 when median import time or create_app time exceeds budget in startup_budget.json.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from application import create_app
+imported = time.perf_counter()
+create_app()
+print("STARTUP", round((imported - start) * 1000, 3), round((time.perf_counter() - imported) * 1000, 3))
+"""
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def run_once() -> tuple:
+    env = dict(os.environ, BE_ENV=os.environ.get("BE_ENV", "prod"), FERNET_KEY=os.environ.get("FERNET_KEY", ""))
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr)
+
+    imports = []
+
+    for line in res.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+
+        if match:
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3))))
+
+    import_ms, create_app_ms = (float(v) for v in res.stdout.split("STARTUP")[-1].split())
+
+    return import_ms, create_app_ms, imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--report", help="write full importtime report of the last run to file")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r[0] for r in runs)
+    create_app_ms = statistics.median(r[1] for r in runs)
+    imports = runs[-1][2]
+
+    print(f'IMPORT_MS;{import_ms}')
+    print(f'CREATE_APP_MS;{create_app_ms}')
+    print(f'MODULES;{len(imports)}')
+    print("TOP_LEVEL_CUMULATIVE_US;MODULE")
+
+    for name, _, cumulative, _ in sorted((i for i in imports if i[3] <= 2), key=lambda i: -i[2])[:args.top]:
+        print(f'{cumulative};{name}')
+
+    if args.report:
+        with open(args.report, "w") as report:
+            report.write("SELF_US;CUMULATIVE_US;MODULE\n")
+
+            for name, self_us, cumulative, depth in imports:
+                report.write(f'{self_us};{cumulative};{" " * (depth - 1)}{name}\n')
+
+    with open(BUDGET_PATH) as budget_file:
+        budget = json.load(budget_file)
+
+    failed = [
+        f'{name}: {value} ms > {budget[name]} ms'
+        for name, value in (("import_ms", import_ms), ("create_app_ms", create_app_ms))
+        if value > budget[name]
+    ]
+
+    forbidden = [m for m in budget.get("forbidden_modules", []) if any(i[0] == m for i in imports)]
+
+    if forbidden:
+        failed.append(f'modules imported on startup: {", ".join(forbidden)}')
+
+    if failed:
+        print("STARTUP BUDGET EXCEEDED - " + "; ".join(failed))
+        sys.exit(1)
+
+    print("STARTUP BUDGET OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Microbenchmarks of CPU-side transformations of Fabman data with synthetic large inputs (Fabman calls are stubbed).
+Results are stored per commit in benchmarks/results/transform-<commit>.json and compared with the previous stored
+result (or --compare <commit>), changes over --threshold are reported as regressions.
+Run from bridge directory: python -m benchmarks.transform_benchmark [--courses 500] [--trainings 200]
+[--failed 300] [--repeat 7] [--compare COMMIT] [--fail-on-regression]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("FERNET_KEY", Fernet.generate_key().decode())
+
+from flask import Flask
+
+from application.services import api_functions
+from application.services.tools import get_current_training_with_index, get_member_training, decrypt_identifiers
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def make_course(i: int) -> Dict:
+    return {
+        "id": i,
+        "title": f'Course {i}',
+        "notes": "for_web" if i % 3 else "for_offline",
+        "lockVersion": 1,
+        "updatedAt": "2024-01-01T00:00:00.000Z",
+        "metadata": {"courses_cm": {
+            "cm_url": f'https://www.classmarker.com/online-test/start/?quiz={i:08d}',
+            "yt_url": f'https://youtu.be/{i:011d}',
+            "cs_name": f'Kurz {i}',
+            "en_name": f'Course {i}'
+        }}
+    }
+
+
+def make_inputs(courses: int, trainings: int, failed: int) -> Dict:
+    catalog = [make_course(i) for i in range(1, courses + 1)]
+    today = date.today()
+    member_trainings = [
+        {
+            "id": 10_000 + i,
+            "trainingCourse": catalog[i % courses]["id"],
+            "date": "2024-01-01",
+            "untilDate": (today + timedelta(days=(i % 60) - 20)).isoformat() if i % 4 else None,
+            "_embedded": {"trainingCourse": catalog[i % courses]}
+        }
+        for i in range(trainings)
+    ]
+    failed_courses = [
+        {"id": 100_000 + i, "title": f'Course {100_000 + i}', "attempts": 1} for i in range(failed)
+    ]
+    member = {
+        "id": 1,
+        "emailAddress": "member@example.invalid",
+        "lockVersion": 7,
+        "metadata": {"courses_cm": {"failed_courses": failed_courses}},
+        "_embedded": {"privileges": {"privileges": "member"}, "trainings": member_trainings}
+    }
+    expired = next(t for t in reversed(member_trainings) if t["untilDate"] and t["untilDate"] < today.isoformat())
+
+    return {
+        "catalog": catalog,
+        "member": member,
+        "member_trainings": member_trainings,
+        "failed_courses": failed_courses,
+        "last_failed_id": failed_courses[-1]["id"],
+        "expired_training": expired["trainingCourse"],
+        "token": Fernet(os.environ["FERNET_KEY"].encode()).encrypt(b"1-500").decode()
+    }
+
+
+def cases(inputs: Dict) -> List[Tuple[str, Callable]]:
+    catalog = inputs["catalog"]
+    member = inputs["member"]
+    last_course = catalog[-1]["id"]
+    member_data = {"metadata": member["metadata"]}
+
+    return [
+        ("get_current_training_with_index",
+         lambda: get_current_training_with_index(inputs["failed_courses"], inputs["last_failed_id"])),
+        ("get_member_training", lambda: get_member_training(-1, inputs["member_trainings"])),
+        ("parse_failed_courses_data",
+         lambda: api_functions.parse_failed_courses_data(member["metadata"], inputs["last_failed_id"])),
+        ("check_members_training",
+         lambda: api_functions.check_members_training(inputs["expired_training"], inputs["member_trainings"])),
+        ("get_active_user_trainings_and_user_data",
+         lambda: api_functions.get_active_user_trainings_and_user_data("1", "token")),
+        ("get_list_of_available_trainings_fn", lambda: api_functions.get_list_of_available_trainings_fn("1")),
+        ("get_list_of_absolved_trainings_fn", lambda: api_functions.get_list_of_absolved_trainings_fn("1")),
+        ("create_cm_link",
+         lambda: api_functions.create_cm_link(1, last_course, catalog, token="token", member_data=member_data)),
+        ("decrypt_identifiers", lambda: decrypt_identifiers(inputs["token"]))
+    ]
+
+
+def measure(case: Callable, repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    runs = [t / number * 1_000_000 for t in timer.repeat(repeat=repeat, number=number)]
+
+    return {"min_us": round(min(runs), 2), "median_us": round(statistics.median(runs), 2)}
+
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "."]).returncode != 0
+
+        return f'{commit}-dirty' if dirty else commit
+
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_baseline(compare: str, commit: str) -> Dict | None:
+    """
+    Stored result of commit (prefix), or the newest stored result of another commit.
+    """
+
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "transform-*.json")), key=os.path.getmtime, reverse=True)
+
+    for path in paths:
+        name = os.path.basename(path)[len("transform-"):-len(".json")]
+
+        if (compare and name.startswith(compare)) or (not compare and name != commit):
+            with open(path) as f:
+                return json.load(f)
+
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--trainings", type=int, default=200)
+    parser.add_argument("--failed", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--compare", help="commit of baseline result (default: the newest result of another commit)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.courses, args.trainings, args.failed)
+    app = Flask("transform_benchmark")
+    results = {}
+
+    with mock.patch.object(api_functions, "fetch_member", return_value=inputs["member"]),\
+            mock.patch.object(api_functions, "fetch_training_courses", return_value=inputs["catalog"]),\
+            app.test_request_context():
+        for name, case in cases(inputs):
+            results[name] = measure(case, args.repeat)
+
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "inputs": {"courses": args.courses, "trainings": args.trainings, "failed": args.failed},
+        "results": results
+    }
+    baseline = load_baseline(args.compare, commit)
+    regressions = []
+
+    print(f'CASE;MIN_US;MEDIAN_US;BASELINE_MIN_US;CHANGE (baseline {baseline["commit"] if baseline else "-"})')
+
+    for name, result in results.items():
+        base = (baseline or {}).get("results", {}).get(name)
+        change = result["min_us"] / base["min_us"] - 1 if base else None
+
+        if change is not None and change > args.threshold:
+            regressions.append(name)
+
+        print(";".join(str(v) for v in [
+            name,
+            result["min_us"],
+            result["median_us"],
+            base["min_us"] if base else "-",
+            f'{change:+.1%}' if change is not None else "-"
+        ]))
+
+    if baseline and baseline.get("inputs") != report["inputs"]:
+        print("WARNING: baseline was measured with different inputs")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+
+        with open(os.path.join(RESULTS_DIR, f'transform-{commit}.json'), "w") as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print(f'REGRESSIONS over {args.threshold:.0%}: {", ".join(regressions)}')
+
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Replay of recorded ClassMarker webhooks (RECORD_PATH of bridge) at accelerated speed against local bridge wired to
+Fabman stand-in answering from the recording. Reports throughput, latency distribution and differences of responses
+and Fabman writes against the recorded outcomes.
+Run from bridge directory: python -m benchmarks.webhook_replay recording.jsonl [--speed 1 10 100] [--workers 32]
+[--bridge-url URL --fabman-port PORT] [--output report.json]
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import Dict, List
+
+import requests
+from cryptography.fernet import Fernet
+from werkzeug.serving import make_server
+
+from benchmarks.fabman_standin import FabmanStandIn, PREFIX, load_recording
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+
+    if not values:
+        return {}
+
+    return {
+        **{f'p{p}': round(values[min(int(len(values) * p / 100), len(values) - 1)] * 1000, 1) for p in (50, 90, 99)},
+        "max": round(values[-1] * 1000, 1)
+    }
+
+
+def build_request(entry: Dict, fernet: Fernet, secret: str = None) -> Dict:
+    """
+    Webhook body with cm_user_id encrypted by key of local bridge and headers (signed by secret, if set).
+    """
+
+    payload = json.loads(json.dumps(entry["payload"]))
+
+    if entry.get("identifiers") and "result" in payload:
+        payload["result"]["cm_user_id"] = fernet.encrypt(entry["identifiers"].encode()).decode()
+
+    body = json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json"}
+
+    if secret:
+        digest = hmac.new(secret.encode(), msg=body, digestmod=hashlib.sha256).digest()
+        headers["X-Classmarker-Hmac-Sha256"] = base64.b64encode(digest).decode()
+
+    return {"data": body, "headers": headers}
+
+
+def replay(entries: List[Dict], standin: FabmanStandIn, bridge_url: str, speed: float, workers: int) -> Dict:
+    """
+    Send recorded webhooks with recorded inter-arrival times divided by speed.
+    :return: report of the replay
+    """
+
+    fernet = Fernet(os.environ["FERNET_KEY"].encode())
+    secret = os.getenv("CLASSMARKER_WEBHOOK_SECRET")
+    prepared = [build_request(entry, fernet, secret) for entry in entries]
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=workers))
+    standin.reset()
+
+    def send(i: int):
+        start = time.perf_counter()
+        res = session.post(f'{bridge_url}/add_classmarker_training', timeout=60, **prepared[i])
+
+        return i, time.perf_counter() - start, res.status_code, res.text
+
+    first = entries[0]["time"]
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+
+        for i, entry in enumerate(entries):
+            delay = (entry["time"] - first) / speed - (time.perf_counter() - start)
+
+            if delay > 0:
+                time.sleep(delay)
+
+            futures.append(executor.submit(send, i))
+
+        results = [f.result() for f in futures]
+
+    duration = time.perf_counter() - start
+    recorded_writes = Counter(
+        f'{call["method"]} {call["path"]}' for entry in entries for call in entry["fabman"] if call["method"] != "GET"
+    )
+    diffs = [
+        {"index": i, "recorded": entries[i]["response"], "replayed": {"status": status, "body": body}}
+        for i, _, status, body in results
+        if (status, body) != (entries[i]["response"]["status"], entries[i]["response"]["body"])
+    ]
+
+    return {
+        "speed": speed,
+        "requests": len(results),
+        "duration": round(duration, 3),
+        "throughput_per_s": round(len(results) / duration, 2) if duration else None,
+        "latency_ms": percentiles([r[1] for r in results]),
+        "recorded_latency_ms": percentiles([e["duration"] for e in entries]),
+        "statuses": dict(Counter(r[2] for r in results)),
+        "response_diffs": len(diffs),
+        "response_diff_examples": diffs[:5],
+        "missing_writes": dict(recorded_writes - standin.writes),
+        "extra_writes": dict(standin.writes - recorded_writes),
+        "unrecorded_fabman_calls": dict(standin.unknown)
+    }
+
+
+def start_bridge(fabman_url: str) -> str:
+    """
+    Start bridge in this process on free port, with Fabman API URL of stand-in and suppressed emails.
+    :return: URL of bridge
+    """
+
+    os.environ["FABMAN_API_URL"] = fabman_url
+    os.environ.setdefault("FERNET_KEY", Fernet.generate_key().decode())
+    os.environ.setdefault("FABMAN_API_KEY", "replay")
+
+    from application import create_app
+    from application.services.extensions import mail
+
+    app = create_app()
+    app.config["MAIL_SUPPRESS_SEND"] = True
+    mail.init_app(app)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    Thread(target=server.serve_forever, name="bridge", daemon=True).start()
+
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--bridge-url", help="running bridge with FABMAN_API_URL of stand-in (--fabman-port)")
+    parser.add_argument("--fabman-port", type=int, default=0)
+    parser.add_argument("--output", help="file for JSON report")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    entries = load_recording(args.recording)
+    standin = FabmanStandIn(entries)
+    fabman_server = standin.serve(port=args.fabman_port)
+    fabman_url = f'http://127.0.0.1:{fabman_server.server_port}{PREFIX}'
+    bridge_url = args.bridge_url or start_bridge(fabman_url)
+    print(f'Replaying {len(entries)} webhooks against {bridge_url} (Fabman stand-in {fabman_url})')
+
+    reports = []
+
+    for speed in args.speed:
+        report = replay(entries, standin, bridge_url, speed, args.workers)
+        reports.append(report)
+        print(json.dumps({k: v for k, v in report.items() if k != "response_diff_examples"}))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
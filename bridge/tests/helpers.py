@@ -0,0 +1,139 @@
+"""
+Shared fixtures of bridge tests: environment of test app and mocked Fabman API (patch requests.request by FakeFabman).
+"""
+import json
+import os
+from typing import Dict, List
+
+import requests
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("FERNET_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("FABMAN_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("CRONJOB_TOKEN", "cron")
+os.environ.setdefault("FABLAB_SUPPORT_EMAIL", "support@example.invalid")
+os.environ.setdefault("MAIL_USERNAME", "bridge@example.invalid")
+
+from flask import Flask
+
+from application import create_app
+from application.services.extensions import mail
+
+
+MEMBER_ID = 5
+COURSE_ID = 3
+CATALOG_SIZE = 4
+
+_app = None
+
+
+def get_app() -> Flask:
+    """
+    Test app shared by all tests of the process (extensions start background threads), emails are not sent.
+    """
+
+    global _app
+
+    if _app is None:
+        _app = create_app()
+        _app.config["MAIL_SUPPRESS_SEND"] = True
+        mail.init_app(_app)
+
+    return _app
+
+
+def encrypt_identifiers(member_id: int = MEMBER_ID, course_id: int = COURSE_ID) -> str:
+    return Fernet(os.environ["FERNET_KEY"].encode()).encrypt(f'{member_id}-{course_id}'.encode()).decode()
+
+
+def course(course_id: int) -> Dict:
+    return {
+        "id": course_id,
+        "title": f'Course {course_id}',
+        "notes": "for_web",
+        "lockVersion": 1,
+        "metadata": {"courses_cm": {"cm_url": f'https://www.classmarker.com/online-test/start/?quiz={course_id}'}}
+    }
+
+
+def training(training_id: int, course_id: int, until: str = None) -> Dict:
+    return {
+        "id": training_id,
+        "trainingCourse": course_id,
+        "date": "2020-01-01",
+        "untilDate": until,
+        "_embedded": {"trainingCourse": course(course_id)}
+    }
+
+
+def member(expired_training: bool = False, trainings: List[Dict] = None, lock_version: int = 1) -> Dict:
+    if trainings is None:
+        trainings = [training(100, COURSE_ID, "2021-01-01")] if expired_training else []
+
+    return {
+        "id": MEMBER_ID,
+        "emailAddress": "member@example.invalid",
+        "lockVersion": lock_version,
+        "metadata": {"courses_cm": {"failed_courses": [{"id": COURSE_ID, "title": "Course 3", "attempts": 1}]}},
+        "_embedded": {"privileges": {"privileges": "member"}, "trainings": trainings}
+    }
+
+
+def response(status: int, data=None) -> requests.Response:
+    res = requests.Response()
+    res.status_code = status
+    res._content = json.dumps(data if data is not None else {}).encode()
+
+    return res
+
+
+class FakeFabman:
+    """
+    Fabman API answering with member MEMBER_ID and catalog of CATALOG_SIZE courses, received calls are in calls.
+    :param expired_training: member has expired training of COURSE_ID
+    :param missing_course: training-course details respond 404
+    :param put_statuses: statuses of the next PUT requests (200 when they run out)
+    :param trainings: trainings of member (overrides expired_training)
+    """
+
+    def __init__(self, expired_training: bool = False, missing_course: bool = False, put_statuses: List[int] = (),
+                 trainings: List[Dict] = None):
+        self.expired_training = expired_training
+        self.missing_course = missing_course
+        self.put_statuses = list(put_statuses)
+        self.trainings = trainings
+        self.lock_version = 1
+        self.calls: List[tuple] = []
+
+    def member(self) -> Dict:
+        return member(self.expired_training, self.trainings, self.lock_version)
+
+    def __call__(self, method: str, url: str, **kwargs) -> requests.Response:
+        path = url.split("?")[0]
+        self.calls.append((method, path))
+
+        if method == "GET" and "/training-courses/" in path:
+            if self.missing_course:
+                return response(404, {"error": "not found"})
+
+            return response(200, course(int(path.rsplit("/", 1)[1])))
+
+        if method == "GET" and path.endswith("/training-courses"):
+            return response(200, [course(i) for i in range(1, CATALOG_SIZE + 1)])
+
+        if method == "GET" and "/members/" in path:
+            return response(200, self.member())
+
+        if method == "GET" and path.endswith("/members"):
+            return response(200, [self.member()] if "offset=0" in url or "offset" not in url else [])
+
+        if method == "PUT":
+            status = self.put_statuses.pop(0) if self.put_statuses else 200
+
+            if status == 200:
+                self.lock_version += 1
+
+            return response(status, self.member() if status == 200 else {"error": "rejected"})
+
+        return response(201 if method == "POST" else 204)
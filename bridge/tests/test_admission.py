@@ -0,0 +1,64 @@
+"""
+Admission control of bridge endpoints (Fabman API is mocked).
+"""
+import unittest
+from unittest import mock
+
+from helpers import COURSE_ID, MEMBER_ID, FakeFabman, get_app
+
+from application.configs.config import ADMISSION_RETRY_AFTER
+from application.services import admission
+from application.services.admission import AdmissionLimit
+
+
+class AdmissionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def limit(self, name: str) -> AdmissionLimit:
+        limit = AdmissionLimit(name, 1, 0, 0)
+        patcher = mock.patch.dict(admission.limits, {name: limit})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        return limit
+
+    def test_overloaded_class_is_rejected_with_retry_after(self):
+        limit = self.limit("expiration")
+        limit.acquire()
+        fabman = FakeFabman()
+
+        with mock.patch("requests.request", fabman):
+            res = self.app.test_client().post("/training_expiration", json={"member_id": MEMBER_ID,
+                                              "training_id": COURSE_ID}, headers={"CronjobToken": "cron"})
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.headers["Retry-After"], str(ADMISSION_RETRY_AFTER))
+        self.assertEqual(fabman.calls, [])
+
+    def test_slot_is_released_after_request(self):
+        limit = self.limit("reads")
+
+        with mock.patch("requests.request", FakeFabman()):
+            res = self.app.test_client().get(f'/absolved_trainings/{MEMBER_ID}')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(limit.active, 0)
+
+    def test_slot_is_held_until_streamed_response_is_closed(self):
+        limit = self.limit("reads")
+
+        with mock.patch("requests.request", FakeFabman()):
+            res = self.app.test_client().post("/available_trainings/batch", json={"member_ids": [MEMBER_ID]},
+                                              headers={"Authorization": "test"}, buffered=False)
+
+            self.assertEqual(limit.active, 1)
+            self.assertEqual(len(res.get_data().splitlines()), 1)
+            res.close()
+
+        self.assertEqual(limit.active, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Available trainings endpoints (Fabman API is mocked).
+"""
+import json
+import unittest
+from unittest import mock
+
+from helpers import CATALOG_SIZE, COURSE_ID, MEMBER_ID, FakeFabman, course, get_app, training
+
+from application.services.catalog import get_catalog_projection
+
+
+class AvailableTrainingsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def test_absolved_courses_are_not_available(self):
+        with mock.patch("requests.request", FakeFabman(trainings=[training(100, 2)])):
+            res = self.app.test_client().get(f'/available_trainings/{MEMBER_ID}')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([t["id"] for t in res.json], [1, 3, 4])
+        self.assertEqual(res.json[0]["en_name"], "Course 1")
+
+    def test_catalog_projection_is_reused_until_course_changes(self):
+        catalog = [course(i) for i in range(1, CATALOG_SIZE + 1)]
+        projection = get_catalog_projection(catalog)
+
+        self.assertIs(get_catalog_projection([course(i) for i in range(1, CATALOG_SIZE + 1)]), projection)
+
+        catalog[0]["lockVersion"] += 1
+        changed = get_catalog_projection(catalog)
+
+        self.assertIsNot(changed, projection)
+        self.assertNotEqual(changed.version, projection.version)
+
+
+class AvailableTrainingsBatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def post_batch(self, member_ids: list, headers: dict):
+        return self.app.test_client().post("/available_trainings/batch", json={"member_ids": member_ids},
+                                           headers=headers)
+
+    def test_missing_authorization_is_rejected_before_fabman_calls(self):
+        fabman = FakeFabman()
+
+        with mock.patch("requests.request", fabman):
+            res = self.post_batch([MEMBER_ID], {})
+
+        self.assertIn(b"Unauthorized access", res.data)
+        self.assertEqual(fabman.calls, [])
+
+    def test_rows_of_every_member_are_streamed(self):
+        with mock.patch("requests.request", FakeFabman()):
+            res = self.post_batch([MEMBER_ID, MEMBER_ID + 1], {"Authorization": "test"})
+            rows = [json.loads(row) for row in res.get_data().splitlines()]
+
+        self.assertEqual(res.mimetype, "application/x-ndjson")
+        self.assertEqual(sorted(row["member_id"] for row in rows), [MEMBER_ID, MEMBER_ID + 1])
+        self.assertTrue(all("error" not in row for row in rows))
+        self.assertIn(COURSE_ID, [t["id"] for t in rows[0]["trainings"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
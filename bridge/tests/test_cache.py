@@ -0,0 +1,95 @@
+"""
+Cache of Fabman reads (time is mocked, loaders count their calls).
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from application.services.cache import FabmanCache, SQLiteCacheBackend
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self) -> dict:
+        self.calls += 1
+
+        return {"version": self.calls}
+
+
+class StaleWhileRevalidateTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("application.services.cache.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = FabmanCache(ttl=60, max_stale=300)
+        self.loader = Loader()
+
+    def get(self, after: float) -> dict:
+        self.now += after
+
+        return self.cache.get("https://fabman.io/api/v1/training-courses", self.loader)
+
+    def test_fresh_entry_is_not_fetched_again(self):
+        self.assertEqual(self.get(0), {"version": 1})
+        self.assertEqual(self.get(59), {"version": 1})
+        self.assertEqual(self.loader.calls, 1)
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        self.get(0)
+
+        self.assertEqual(self.get(61), {"version": 1})
+        self.cache._executor.shutdown(wait=True)
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.get(1), {"version": 2})
+
+    def test_too_old_entry_is_fetched_inline(self):
+        self.get(0)
+
+        self.assertEqual(self.get(60 + 300), {"version": 2})
+
+    def test_zero_ttl_disables_cache(self):
+        self.cache = FabmanCache(ttl=0, max_stale=300)
+        self.get(0)
+
+        self.assertEqual(self.get(0), {"version": 2})
+        self.assertEqual(self.cache.backend.size(), 0)
+
+
+class SharedBackendTest(unittest.TestCase):
+    """Two backends on one file stand for two worker processes."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "cache.sqlite")
+        self.first, self.second = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+
+    def test_entry_and_update_are_visible_to_other_worker(self):
+        self.first.set("https://fabman.io/api/v1/training-courses", [{"id": 1}], 1000.0)
+
+        self.assertEqual(self.second.get("https://fabman.io/api/v1/training-courses"), ([{"id": 1}], 1000.0))
+
+        self.first.set("https://fabman.io/api/v1/training-courses", [{"id": 2}], 1001.0)
+
+        self.assertEqual(self.second.get("https://fabman.io/api/v1/training-courses"), ([{"id": 2}], 1001.0))
+
+    def test_invalidation_is_visible_to_other_worker(self):
+        self.first.set("https://fabman.io/api/v1/training-courses?embed=x", [], 1000.0)
+        self.second.get("https://fabman.io/api/v1/training-courses?embed=x")
+        self.first.delete_prefix("https://fabman.io/api/v1/training-courses")
+
+        self.assertIsNone(self.second.get("https://fabman.io/api/v1/training-courses?embed=x"))
+
+    def test_only_one_worker_claims_refresh(self):
+        self.first.set("https://fabman.io/api/v1/training-courses", [], 1000.0)
+
+        self.assertTrue(self.first.claim_refresh("https://fabman.io/api/v1/training-courses", 30))
+        self.assertFalse(self.second.claim_refresh("https://fabman.io/api/v1/training-courses", 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Request deadlines and timeouts of outbound Fabman calls (Fabman API is mocked).
+"""
+import unittest
+from unittest import mock
+
+from helpers import MEMBER_ID, FakeFabman, get_app
+
+from application.configs.config import FABMAN_TIMEOUT
+from application.services.deadline import call_timeout
+
+
+class TimeoutRecordingFabman(FakeFabman):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.timeouts = []
+
+    def __call__(self, method: str, url: str, **kwargs):
+        self.timeouts.append(kwargs["timeout"])
+
+        return super().__call__(method, url, **kwargs)
+
+
+class DeadlineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def get_absolved(self, deadline: str) -> tuple:
+        fabman = TimeoutRecordingFabman()
+
+        with mock.patch("requests.request", fabman):
+            res = self.app.test_client().get(f'/absolved_trainings/{MEMBER_ID}',
+                                              headers={"X-Request-Deadline": deadline})
+
+        return res, fabman
+
+    def test_caller_deadline_limits_call_timeout(self):
+        res, fabman = self.get_absolved("2")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(fabman.timeouts), 1)
+        self.assertLessEqual(fabman.timeouts[0], 2)
+
+    def test_exceeded_deadline_skips_fabman_call(self):
+        res, fabman = self.get_absolved("0.01")
+
+        self.assertIn(b"Request deadline exceeded", res.data)
+        self.assertEqual(fabman.calls, [])
+
+    def test_no_deadline_outside_of_request(self):
+        self.assertEqual(call_timeout(FABMAN_TIMEOUT), FABMAN_TIMEOUT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Notifications of failed webhooks (Fabman API is mocked, emails are recorded instead of sent).
+"""
+import unittest
+from unittest import mock
+
+from helpers import MEMBER_ID, FakeFabman, get_app
+
+from application.services.error_reporting import ErrorReporter
+from application.services.extensions import mail
+
+
+class ErrorReporterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def report_and_send(self, reporter: ErrorReporter, count: int, member_id: int = MEMBER_ID) -> list:
+        with self.app.test_request_context(), mock.patch("requests.request", FakeFabman()),\
+                mail.record_messages() as outbox:
+            for _ in range(count):
+                reporter.report("add_classmarker_training_fn", KeyError("title"), ["Traceback", "KeyError"], member_id)
+
+            while not reporter.queue.empty():
+                reporter._notify(*reporter.queue.get_nowait()[:4])
+
+        return outbox
+
+    def test_every_failure_emails_user_support_alerted_once(self):
+        outbox = self.report_and_send(ErrorReporter(), 2)
+
+        self.assertEqual([m.recipients for m in outbox if m.recipients != ["support@example.invalid"]],
+                         [["member@example.invalid"], ["member@example.invalid"]])
+        self.assertEqual(sum(m.recipients == ["support@example.invalid"] for m in outbox), 1)
+
+    def test_repeated_failure_without_member_is_only_counted(self):
+        reporter = ErrorReporter()
+        outbox = self.report_and_send(reporter, 3, member_id=None)
+
+        self.assertEqual(len(outbox), 1)
+        self.assertEqual(sum(e["count"] for e in reporter._errors.values()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Conditional GET of member training endpoints (Fabman API is mocked).
+"""
+import unittest
+from unittest import mock
+
+from helpers import MEMBER_ID, FakeFabman, get_app, training
+
+
+class ConditionalGetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def get(self, path: str, fabman: FakeFabman, etag: str = None):
+        with mock.patch("requests.request", fabman):
+            return self.app.test_client().get(path, headers={"If-None-Match": etag} if etag else {})
+
+    def test_unchanged_member_gets_not_modified(self):
+        for path in (f'/available_trainings/{MEMBER_ID}', f'/absolved_trainings/{MEMBER_ID}',
+                     f'/member_dashboard/{MEMBER_ID}'):
+            with self.subTest(path=path):
+                fabman = FakeFabman(trainings=[training(100, 2)])
+                first = self.get(path, fabman)
+                second = self.get(path, fabman, first.headers["ETag"])
+
+                self.assertEqual(first.status_code, 200)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second.get_data(), b"")
+
+    def test_changed_member_gets_new_body(self):
+        path = f'/available_trainings/{MEMBER_ID}'
+        first = self.get(path, FakeFabman(trainings=[training(100, 2)]))
+        second = self.get(path, FakeFabman(trainings=[]), first.headers["ETag"])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(len(second.json), len(first.json) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Circuit breaker of Fabman calls and stale-data fallback of read endpoints (time and Fabman API are mocked).
+"""
+import unittest
+from unittest import mock
+
+from helpers import MEMBER_ID, FakeFabman, get_app, response, training
+
+from application.services import fabman
+from application.services.fabman import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("application.services.fabman.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, window=4, slow_call=5, open_seconds=30)
+
+    def open_circuit(self):
+        for success in (True, False, True, False):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(success, 0.1)
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_open_circuit_rejects_calls(self):
+        self.open_circuit()
+        self.now += 29
+
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_single_probe_through(self):
+        self.open_circuit()
+        self.now += 30
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record(True, 0.1)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_opens_circuit_again(self):
+        self.open_circuit()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.record(True, 6)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now += 29
+        self.assertFalse(self.breaker.allow())
+
+
+class StaleFallbackTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def setUp(self):
+        patcher = mock.patch.object(fabman, "breaker", CircuitBreaker("test", min_calls=100))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_endpoint_serves_last_known_good_data(self):
+        path = f'/absolved_trainings/{MEMBER_ID}'
+
+        with mock.patch("requests.request", FakeFabman(trainings=[training(100, 2)])):
+            fresh = self.app.test_client().get(path)
+
+        with mock.patch("requests.request", lambda *args, **kwargs: response(503, {"error": "maintenance"})):
+            stale = self.app.test_client().get(path)
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.headers.get("X-Stale-Data"), "true")
+        self.assertEqual(len(fresh.json), 1)
+        self.assertEqual(stale.json, fresh.json)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Outbound Fabman calls of ClassMarker webhook (Fabman API is mocked).
+Run from bridge directory: python -m unittest discover tests (or python -m pytest tests)
+"""
+import unittest
+from unittest import mock
+
+from helpers import FakeFabman, encrypt_identifiers, get_app
+
+from application.services.call_budget import ROUTE_BUDGETS, expect_calls
+from application.services.error_reporting import error_reporter
+
+
+class ClassMarkerWebhookCallsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+        cls.token = encrypt_identifiers()
+
+    def post_result(self, passed: bool):
+        return self.app.test_client().post(
+            "/add_classmarker_training",
+            json={"payload_status": "live", "result": {"cm_user_id": self.token, "passed": passed}}
+        )
+
+    def test_renewal_within_budget(self):
+        # GET member, GET course, PUT attempts, POST training, GET member, PUT failed courses, DELETE old training
+        with mock.patch("requests.request", FakeFabman(expired_training=True)),\
+                expect_calls(ROUTE_BUDGETS["main.add_classmarker_training"], {"GET /members/{id}": 2}) as calls:
+            res = self.post_result(passed=True)
+
+        self.assertEqual(res.data, b"Training passed, updated in Fabman")
+        self.assertEqual(calls["DELETE /members/{id}/trainings/{id}"], 1)
+
+    def test_failed_webhook_reuses_member_for_error_email(self):
+        with mock.patch("requests.request", FakeFabman(missing_course=True)),\
+                expect_calls(ROUTE_BUDGETS["main.add_classmarker_training"], {"GET /members/{id}": 1}) as calls:
+            res = self.post_result(passed=False)
+            error_reporter.queue.join()
+
+        self.assertIn(b"Error during data fetching", res.data)
+        self.assertEqual(calls["GET /members/{id}"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
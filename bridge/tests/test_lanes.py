@@ -0,0 +1,58 @@
+"""
+Priority lanes of outbound Fabman calls.
+"""
+import threading
+import time
+import unittest
+
+from helpers import get_app
+
+from application.services.lanes import BATCH, INTERACTIVE, LaneTimeout, PriorityLanes, current_lane
+
+
+class PriorityLanesTest(unittest.TestCase):
+    def test_batch_gets_only_its_share_of_slots(self):
+        lanes = PriorityLanes("test", concurrency=2, batch_concurrency=1)
+
+        with lanes.slot(BATCH, 1):
+            with self.assertRaises(LaneTimeout):
+                with lanes.slot(BATCH, 0.05):
+                    pass
+
+            with lanes.slot(INTERACTIVE, 0.05) as delay:
+                self.assertLess(delay, 0.05)
+
+    def test_waiting_interactive_call_goes_before_batch(self):
+        lanes = PriorityLanes("test", concurrency=1, batch_concurrency=1)
+        order = []
+
+        def call(lane: str):
+            with lanes.slot(lane, 5):
+                order.append(lane)
+
+        with lanes.slot(INTERACTIVE, 1):
+            threads = [threading.Thread(target=call, args=(lane,)) for lane in (BATCH, INTERACTIVE)]
+
+            for thread in threads:
+                thread.start()
+                time.sleep(0.05)
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, [INTERACTIVE, BATCH])
+
+    def test_lane_of_route(self):
+        app = get_app()
+
+        self.assertEqual(current_lane(), BATCH)
+
+        with app.test_request_context("/training_expiration", method="POST"):
+            self.assertEqual(current_lane(), BATCH)
+
+        with app.test_request_context("/absolved_trainings/5"):
+            self.assertEqual(current_lane(), INTERACTIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
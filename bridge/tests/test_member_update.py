@@ -0,0 +1,88 @@
+"""
+Serialized member updates and retries of lockVersion conflicts (Fabman API is mocked).
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+from helpers import MEMBER_ID, FakeFabman, get_app
+
+from application.configs.config import MEMBER_UPDATE_RETRIES
+from application.services.api_functions import update_member_metadata
+from application.services.error_handlers import CustomError
+from application.services.member_lock import MemberLocks
+
+
+class ConcurrentFabman(FakeFabman):
+    """Member is changed by somebody else with every rejected PUT, sent PUT bodies are in puts."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.puts = []
+
+    def __call__(self, method: str, url: str, **kwargs):
+        if method == "PUT":
+            self.puts.append(kwargs["json"])
+
+            if self.put_statuses and self.put_statuses[0] == 409:
+                self.lock_version += 1
+
+        return super().__call__(method, url, **kwargs)
+
+
+def add_note(member_data: dict) -> dict:
+    return {**member_data["metadata"], "note": member_data["lockVersion"]}
+
+
+class MemberUpdateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def update(self, fabman: FakeFabman):
+        with self.app.test_request_context(), mock.patch("requests.request", fabman):
+            return update_member_metadata(MEMBER_ID, fabman.member(), add_note, "Member update failed")
+
+    def test_conflict_is_retried_with_refetched_member(self):
+        fabman = ConcurrentFabman(put_statuses=[409])
+        metadata = self.update(fabman)
+
+        self.assertEqual([put["lockVersion"] for put in fabman.puts], [1, 2])
+        self.assertEqual(metadata["note"], 2)
+
+    def test_conflict_fails_after_retries(self):
+        fabman = ConcurrentFabman(put_statuses=[409] * (MEMBER_UPDATE_RETRIES + 1))
+
+        with self.assertRaises(CustomError):
+            self.update(fabman)
+
+        self.assertEqual(len(fabman.puts), MEMBER_UPDATE_RETRIES + 1)
+
+
+class MemberLocksTest(unittest.TestCase):
+    def test_updates_of_one_member_are_serialized(self):
+        locks = MemberLocks(timeout=5)
+        active = []
+        overlaps = []
+
+        def update(member_id: int):
+            with locks.lock(member_id):
+                active.append(member_id)
+                overlaps.append(active.count(member_id) > 1)
+                time.sleep(0.02)
+                active.remove(member_id)
+
+        threads = [threading.Thread(target=update, args=(member_id,)) for member_id in (1, 1, 1, 2)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [False] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
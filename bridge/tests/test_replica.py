@@ -0,0 +1,57 @@
+"""
+Read replica invalidation after member changes made outside of bridge (Fabman API is mocked).
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from helpers import COURSE_ID, MEMBER_ID, FakeFabman, get_app, member, training
+
+from application.configs.config import FABMAN_API_URL
+from application.services import api_functions
+from application.services.replica import ReadReplica
+
+
+class ReplicaInvalidationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.replica = ReadReplica(os.path.join(directory.name, "replica.sqlite"))
+        self.replica.init_app(self.app)
+        self.replica.put_member(member(trainings=[training(100, COURSE_ID, "2021-01-01")]))
+
+        patcher = mock.patch.object(api_functions, "replica", self.replica)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post_member_changed(self, token: str = "cron"):
+        return self.app.test_client().post("/member_changed", json={"member_id": MEMBER_ID},
+                                           headers={"CronjobToken": token})
+
+    def test_member_changed_drops_replicated_member(self):
+        fabman = FakeFabman(trainings=[])
+
+        with mock.patch("requests.request", fabman):
+            res = self.post_member_changed()
+
+            with self.app.test_request_context():
+                member_data = api_functions.fetch_member(MEMBER_ID, "test")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(member_data["_embedded"]["trainings"], [])
+        self.assertEqual(fabman.calls, [("GET", f'{FABMAN_API_URL}/members/{MEMBER_ID}')])
+
+    def test_unauthorized_member_changed_keeps_replica(self):
+        res = self.post_member_changed(token="wrong")
+
+        self.assertIn(b"Unauthorized access", res.data)
+        self.assertEqual(len(self.replica.get_member(MEMBER_ID)["_embedded"]["trainings"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Training expiration email requested by scheduler (Fabman API is mocked, emails are recorded instead of sent).
+"""
+import unittest
+from unittest import mock
+
+from helpers import COURSE_ID, MEMBER_ID, FakeFabman, get_app
+
+from application.services.call_budget import ROUTE_BUDGETS, expect_calls
+from application.services.extensions import mail
+
+
+class TrainingExpirationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = get_app()
+
+    def post_expiration(self, data: dict, token: str = "cron"):
+        return self.app.test_client().post("/training_expiration", json=data, headers={"CronjobToken": token})
+
+    def test_email_contains_course_title(self):
+        with mock.patch("requests.request", FakeFabman()),\
+                expect_calls(ROUTE_BUDGETS["main.training_expiration"], {}) as calls, mail.record_messages() as outbox:
+            res = self.post_expiration({"member_id": MEMBER_ID, "training_id": COURSE_ID})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(calls["GET /training-courses/{id}"], 1)
+        self.assertEqual(len(outbox), 1)
+        self.assertEqual(outbox[0].recipients, ["member@example.invalid"])
+        self.assertIn(f'<b>Course {COURSE_ID}</b>', outbox[0].html)
+
+    def test_rejects_missing_training_id(self):
+        fabman = FakeFabman()
+
+        with mock.patch("requests.request", fabman):
+            res = self.post_expiration({"member_id": MEMBER_ID})
+
+        self.assertIn(b"Missing member_id or training_id", res.data)
+        self.assertEqual(fabman.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+import json
+import signal
+import time
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread, current_thread, main_thread
+from typing import Callable, Dict, Set, Union
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Schedule interval must be positive")
+
+        self.interval = timedelta(seconds=seconds)
+
+    def next_after(self, dt: datetime) -> datetime:
+        return dt + self.interval
+
+    def __str__(self):
+        return f'every {self.interval.total_seconds():g} s'
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression (minute, hour, day of month, month, day of week), fields support "*", lists,
+    ranges and steps (e.g. "*/15 2-4 * * 1,3,5"). Day of week 0 or 7 is Sunday.
+    """
+
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+
+        if len(fields) != len(self.FIELDS):
+            raise ValueError(f'Cron expression must have 5 fields: "{expression}"')
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.FIELDS)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+
+        for item in field.split(","):
+            item, _, step = item.partition("/")
+
+            if item == "*":
+                start, end = low, high
+
+            elif "-" in item:
+                start, end = (int(i) for i in item.split("-"))
+
+            else:
+                start = int(item)
+                end = high if step else start
+
+            if not low <= start <= end <= high:
+                raise ValueError(f'Invalid cron field "{field}"')
+
+            if step and (not step.isdigit() or int(step) == 0):
+                raise ValueError(f'Invalid step of cron field "{field}", it must be a positive number')
+
+            values.update(range(start, end + 1, int(step or 1)))
+
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day = dt.day in self.days
+        weekday = (dt.weekday() + 1) % 7 in self.weekdays
+
+        if self.any_day or self.any_weekday:
+            return day and weekday
+
+        return day or weekday
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        First matching minute after dt.
+        :param dt: datetime
+        :raises ValueError: expression doesn't match any date in the next 5 years
+        :return: datetime of the next run
+        """
+
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        until = dt + timedelta(days=5 * 366)
+
+        while dt < until:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+
+            else:
+                return dt
+
+        raise ValueError(f'Cron expression "{self.expression}" never matches')
+
+    def __str__(self):
+        return self.expression
+
+
+class Daemon:
+    """
+    Resident scheduler running job on schedule, runs never overlap (run which would start while previous one is still
+    running is skipped, slots missed by long run are not caught up). Status of the daemon is served as JSON by
+    optional HTTP endpoint.
+    """
+
+    def __init__(self, job: Callable[[], Union[Dict, None]], schedule: Union[IntervalSchedule, CronSchedule],
+                 backlog: Callable[[datetime], Dict] = None, run_on_start: bool = False):
+        self.job = job
+        self.schedule = schedule
+        self.backlog = backlog
+        self.run_on_start = run_on_start
+        self.next_run: Union[datetime, None] = None
+        self.last_run: Union[Dict, None] = None
+        self.runs = 0
+        self.skipped = 0
+        self.missed = 0
+        self.started = datetime.now()
+        self._lock = Lock()
+        self._stop = Event()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run_once(self) -> bool:
+        """
+        Run job now, unless previous run is still in progress.
+        :return: job was run
+        """
+
+        if not self._lock.acquire(blocking=False):
+            self.skipped += 1
+            print("Previous run is still in progress, run skipped")
+
+            return False
+
+        start = datetime.now()
+        start_time = time.perf_counter()
+        run = {"start": start.isoformat(timespec="seconds"), "status": "ok"}
+
+        try:
+            run["result"] = self.job()
+
+        except Exception:
+            run["status"] = "error"
+            print(traceback.format_exc())
+
+        finally:
+            run["duration"] = round(time.perf_counter() - start_time, 3)
+            run["end"] = datetime.now().isoformat(timespec="seconds")
+            self.last_run = run
+            self.runs += 1
+            self._lock.release()
+
+        return True
+
+    def serve_forever(self) -> None:
+        """
+        Run job on schedule until SIGTERM/SIGINT (or stop()).
+        """
+
+        if current_thread() is main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, lambda *_: self.stop())
+
+        self.next_run = datetime.now() if self.run_on_start else self.schedule.next_after(datetime.now())
+        print(f'Scheduler daemon started ({self.schedule}), next run at {self.next_run.isoformat(timespec="seconds")}')
+
+        while not self._stop.wait(max((self.next_run - datetime.now()).total_seconds(), 0)):
+            scheduled = self.next_run
+            self.run_once()
+            self.next_run = self.schedule.next_after(scheduled)
+
+            if self.next_run <= datetime.now():
+                self.missed += 1
+                self.next_run = self.schedule.next_after(datetime.now())
+
+        print("Scheduler daemon stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> Dict:
+        status = {
+            "state": "running" if self.running else "idle",
+            "schedule": str(self.schedule),
+            "started": self.started.isoformat(timespec="seconds"),
+            "runs": self.runs,
+            "skipped_runs": self.skipped,
+            "missed_runs": self.missed,
+            "last_run": self.last_run,
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None
+        }
+
+        if self.backlog and self.next_run:
+            status["backlog"] = self.backlog(self.next_run)
+
+        return status
+
+    def start_status_server(self, host: str, port: int) -> ThreadingHTTPServer:
+        """
+        Serve status of daemon as JSON on GET /status (and /) in background thread.
+        :param host: address of status server (keep it local, endpoint is not authenticated)
+        :param port: port of status server
+        :return: server
+        """
+
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/status"):
+                    self.send_error(404)
+
+                    return
+
+                body = json.dumps(daemon.status(), default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), StatusHandler)
+        Thread(target=server.serve_forever, name="status-server", daemon=True).start()
+        print(f'Scheduler status on http://{host}:{server.server_port}/status')
+
+        return server
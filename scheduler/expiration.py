@@ -0,0 +1,105 @@
+# copy of bridge/application/services/expiration.py (scheduler is deployed without bridge), keep them in sync
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Iterable, List, Sequence, Tuple, Union
+
+
+@lru_cache(maxsize=8192)
+def date_ordinal(value: str) -> int:
+    """
+    Proleptic Gregorian ordinal of date, parsed dates are cached (trainings share few distinct dates).
+    :param value: ISO string date ('2023-09-28', also without zero padding '2023-9-28')
+    :return: ordinal of date
+    """
+
+    year, month, day = value[:10].split("-")
+
+    return date(int(year), int(month), int(day)).toordinal()
+
+
+class ExpirationEngine:
+    """
+    Evaluates untilDate of trainings against one date taken at creation of engine (create one engine per request or
+    per run, not per training). Missing untilDate never expires.
+    """
+
+    def __init__(self, today: date = None):
+        self.today = today or date.today()
+        self.today_ordinal = self.today.toordinal()
+
+    def is_expired(self, until: Union[str, None]) -> bool:
+        return bool(until) and date_ordinal(until) < self.today_ordinal
+
+    def expires_within(self, until: Union[str, None], days: int) -> bool:
+        """
+        Training is not expired yet, but it expires in the next days (untilDate is today + days at the latest).
+        """
+
+        return bool(until) and 0 <= date_ordinal(until) - self.today_ordinal <= days
+
+    def expired_mask(self, untils: Sequence[Union[str, None]]) -> List[bool]:
+        """
+        Evaluate batch of untilDate values in one pass against today of engine (dates are parsed once per distinct
+        value by date_ordinal).
+        :param untils: untilDate values (None for trainings without expiration)
+        :return: expired flag of every value
+        """
+
+        today = self.today_ordinal
+
+        return [bool(u) and date_ordinal(u) < today for u in untils]
+
+    def split(self, items: Iterable[Any], key=lambda t: t.get("untilDate")) -> Tuple[List[Any], List[Any]]:
+        """
+        Split items (e.g. trainings) to active and expired ones.
+        :param items: items with untilDate
+        :param key: getter of untilDate of item
+        :return: active items, expired items
+        """
+
+        items = list(items)
+        active, expired = [], []
+
+        for item, is_expired in zip(items, self.expired_mask([key(i) for i in items])):
+            (expired if is_expired else active).append(item)
+
+        return active, expired
+
+
+class ExpirationIndex:
+    """
+    Items sorted by untilDate for range queries (expired before date, expiring within N days) by bisect.
+    Items without untilDate are not indexed.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, Any]] = ()):
+        pairs = sorted(((date_ordinal(u), i) for u, i in items if u), key=lambda p: p[0])
+        self.ordinals = [p[0] for p in pairs]
+        self.items = [p[1] for p in pairs]
+
+    def __len__(self):
+        return len(self.items)
+
+    def count_before(self, day: date) -> int:
+        """
+        Count of items with untilDate before day (expired on that day).
+        """
+
+        return bisect_left(self.ordinals, day.toordinal())
+
+    def expired(self, today: date = None) -> List[Any]:
+        today = today or date.today()
+
+        return self.items[:self.count_before(today)]
+
+    def expiring_within(self, days: int, today: date = None) -> List[Any]:
+        """
+        Items not expired on today, which expire in the next days (untilDate is today + days at the latest).
+        """
+
+        today = today or date.today()
+        start = bisect_left(self.ordinals, today.toordinal())
+        end = bisect_right(self.ordinals, (today + timedelta(days=days)).toordinal())
+
+        return self.items[start:end]
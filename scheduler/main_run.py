@@ -1,14 +1,44 @@
 import os
+import sys
+import json
+import time
 import requests
 from datetime import datetime
-from typing import List, Dict, Union
+from typing import List, Dict, Set, Union
 import traceback
-from functools import wraps
+from contextlib import contextmanager, nullcontext
+
+from daemon import CronSchedule, Daemon, IntervalSchedule
+from report import RunReport
+from expiration import ExpirationEngine, ExpirationIndex
 
 
 RAILWAY_API_URL = os.getenv("RAILWAY_API_URL")
 CRONJOB_TOKEN = os.getenv("CRONJOB_TOKEN")
 FABMAN_API_KEY = os.getenv("FABMAN_API_KEY")
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+FABMAN_TIMEOUT = float(os.getenv("FABMAN_TIMEOUT", "30"))
+BRIDGE_TIMEOUT = float(os.getenv("BRIDGE_TIMEOUT", "30"))
+SCHEDULE_CRON = os.getenv("SCHEDULE_CRON")
+SCHEDULE_INTERVAL = float(os.getenv("SCHEDULE_INTERVAL", "0"))
+RUN_ON_START = os.getenv("RUN_ON_START", "False").lower() in ("true", "1")
+STATUS_HOST = os.getenv("STATUS_HOST", "127.0.0.1")
+STATUS_PORT = int(os.getenv("STATUS_PORT", "0"))
+VERBOSE = os.getenv("VERBOSE", "False").lower() in ("true", "1") or "--verbose" in sys.argv
+REPORT_PATH = os.getenv("REPORT_PATH")
+RUN_HISTORY_PATH = os.getenv("RUN_HISTORY_PATH")
+
+_spans: List[Dict] = []
+
+# pooled connections to Fabman and bridge, reused by all runs of daemon
+session = requests.Session()
+
+# state kept between runs of daemon: trainings of members already notified, but not removed from Fabman (their removal
+# is retried without sending email again, they are forgotten once they are not expired any more or removed)
+_notified: Set[int] = set()
+# (member ID, training ID) of not expired trainings by untilDate from the last run, used only by status endpoint
+# (every run fetches all members again, trainings can be added, renewed or removed in Fabman anytime)
+_expirations = ExpirationIndex()
 
 
 class CustomError(Exception):
@@ -22,30 +52,69 @@ class CustomError(Exception):
         return self.description
 
 
-def expired_date(dt: str, date: bool = True) -> bool:
+@contextmanager
+def span(name: str, **attributes):
     """
-    Compare specific date/datetime with current date/datetime and return if provided date is expired.
-    :param dt: ISO string date ('2023-9-28')
-    :param date: True if function should compare dates, False for comparing datetimes
-    :return: bool - provided date is expired
+    Record tracing span (child of current span) to TRACE_EXPORT_PATH file as JSON line, same format as bridge spans.
+    :param name: name of span
+    :param attributes: span attributes
+    :return: span or None if tracing is disabled
     """
-    dt = datetime(*[int(i) for i in dt.split("-")])
+    if not TRACE_EXPORT_PATH:
+        yield None
+        return
+
+    parent = _spans[-1] if _spans else None
+    current = {
+        "traceId": parent["traceId"] if parent else os.urandom(16).hex(),
+        "spanId": os.urandom(8).hex(),
+        "parentSpanId": parent["spanId"] if parent else None,
+        "name": name,
+        "start": round(time.time(), 6),
+        "duration": None,
+        "status": "ok",
+        "attributes": attributes
+    }
+    start = time.perf_counter()
+    _spans.append(current)
+
+    try:
+        yield current
+
+    except Exception as e:
+        current["status"] = f'error: {e.__class__.__name__}'
+        raise
+
+    finally:
+        _spans.pop()
+        current["duration"] = round(time.perf_counter() - start, 6)
+
+        with open(TRACE_EXPORT_PATH, "a") as f:
+            f.write(f'{json.dumps(current)}\n')
 
-    if date:
-        return dt.date() < datetime.now().date()
 
-    return dt < datetime.now()
+def trace_headers() -> Dict[str, str]:
+    """
+    W3C trace context header of current span for propagation to bridge.
+    :return: dict with traceparent header (empty if tracing is disabled)
+    """
+    if not _spans:
+        return {}
 
+    return {"traceparent": f'00-{_spans[-1]["traceId"]}-{_spans[-1]["spanId"]}-01'}
 
-def data_from_get_request(url: str, token: str) -> Union[List, Dict]:
+
+def data_from_get_request(url: str, token: str, report: RunReport = None) -> Union[List, Dict]:
     """
     Function for GET requests with auth header, returning fetched data.
     :param url: API URL
     :param token: Fabman API token with admin permissions
+    :param report: report of run for latency of the call
     :raises Error during data fetching: request failed
     :return: data from GET request
     """
-    res = requests.get(url, headers={"Authorization": f'{token}'})
+    with span("fabman GET", url=url.split("?")[0]), (report.call("fabman GET") if report else nullcontext()):
+        res = session.get(url, headers={"Authorization": f'{token}'}, timeout=FABMAN_TIMEOUT)
 
     if res.status_code != 200:
         raise CustomError("Error during data fetching", f'{url}, {res.json()}')
@@ -53,44 +122,116 @@ def data_from_get_request(url: str, token: str) -> Union[List, Dict]:
     return res.json()
 
 
-def send_expiration_notification(member_id: int, training_course_id: int) -> bool:
-    res = requests.post(
-        f'{RAILWAY_API_URL}/training_expiration',
-        json={
-            "member_id": member_id,
-            "training_id": training_course_id
-        },
-        headers={"CronjobToken": f'{CRONJOB_TOKEN}'}
-    )
+def send_expiration_notification(member_id: int, training_course_id: int, report: RunReport) -> bool:
+    try:
+        with span("bridge POST /training_expiration", member_id=member_id, training_id=training_course_id) as s,\
+                report.call("bridge POST /training_expiration"):
+            res = session.post(
+                f'{RAILWAY_API_URL}/training_expiration',
+                json={
+                    "member_id": member_id,
+                    "training_id": training_course_id
+                },
+                headers={
+                    "CronjobToken": f'{CRONJOB_TOKEN}',
+                    "X-Request-Deadline": f'{BRIDGE_TIMEOUT * 0.9:.1f}',
+                    **trace_headers()
+                },
+                timeout=BRIDGE_TIMEOUT
+            )
+
+            if s:
+                s["attributes"]["status_code"] = res.status_code
+
+    except requests.RequestException as e:
+        print(f'Error during {training_course_id} for user {member_id}: {e}')
+        report.failure(f'notification: {e.__class__.__name__}')
+
+        return False
 
     if res.status_code != 200:
         print(f'Error during {training_course_id} for user {member_id}')
         print(res.content)
+        report.failure(f'notification: HTTP {res.status_code}')
 
-    else:
+    elif VERBOSE:
         print(f'email with training {training_course_id} sent to user {member_id}')
 
     return res.status_code == 200
 
 
-def remove_expired_course(member_id: int, user_course_id: int) -> bool:
-    res = requests.delete(
-        f'https://fabman.io/api/v1/members/{member_id}/trainings/{user_course_id}',
-        headers={"Authorization": f'{FABMAN_API_KEY}'}
-    )
+def remove_expired_course(member_id: int, user_course_id: int, report: RunReport) -> bool:
+    try:
+        with span("fabman DELETE /members/{id}/trainings/{id}", member_id=member_id),\
+                report.call("fabman DELETE /members/{id}/trainings/{id}"):
+            res = session.delete(
+                f'https://fabman.io/api/v1/members/{member_id}/trainings/{user_course_id}',
+                headers={"Authorization": f'{FABMAN_API_KEY}'},
+                timeout=FABMAN_TIMEOUT
+            )
+
+    except requests.RequestException as e:
+        print(f'Error during removing {user_course_id} for user {member_id}: {e}')
+        report.failure(f'removal: {e.__class__.__name__}')
+
+        return False
 
     if res.status_code != 204:
         print(f'Error during removing {user_course_id} for user {member_id}')
         print(res.content)
+        report.failure(f'removal: HTTP {res.status_code}')
 
-    else:
+    elif VERBOSE:
         print(f'Training {user_course_id} removed from user {member_id}')
 
+    if res.status_code == 204:
+        invalidate_bridge_member(member_id, report)
+
+    return res.status_code == 204
+
+
+def invalidate_bridge_member(member_id: int, report: RunReport) -> bool:
+    """
+    Drop bridge copies (read replica, cache) of member changed directly in Fabman.
+    Failure is only reported, bridge replica is fixed by its next reconcile anyway.
+    """
+
+    try:
+        with span("bridge POST /member_changed", member_id=member_id) as s, report.call("bridge POST /member_changed"):
+            res = session.post(
+                f'{RAILWAY_API_URL}/member_changed',
+                json={"member_id": member_id},
+                headers={
+                    "CronjobToken": f'{CRONJOB_TOKEN}',
+                    "X-Request-Deadline": f'{BRIDGE_TIMEOUT * 0.9:.1f}',
+                    **trace_headers()
+                },
+                timeout=BRIDGE_TIMEOUT
+            )
+
+            if s:
+                s["attributes"]["status_code"] = res.status_code
+
+    except requests.RequestException as e:
+        print(f'Error during invalidation of user {member_id} in bridge: {e}')
+        report.failure(f'invalidation: {e.__class__.__name__}')
+
+        return False
+
+    if res.status_code != 200:
+        print(f'Error during invalidation of user {member_id} in bridge')
+        print(res.content)
+        report.failure(f'invalidation: HTTP {res.status_code}')
+
     return res.status_code == 200
 
 
 def railway_api_healtcheck() -> bool:
-    res = requests.get(f'{RAILWAY_API_URL}/health', headers={"CronjobToken": f'{CRONJOB_TOKEN}'})
+    res = session.get(
+        f'{RAILWAY_API_URL}/health',
+        headers={"CronjobToken": f'{CRONJOB_TOKEN}'},
+        timeout=BRIDGE_TIMEOUT
+    )
 
     if res.status_code != 200:
         print("Railway API is probably down")
@@ -98,53 +239,137 @@ def railway_api_healtcheck() -> bool:
     return res.status_code == 200
 
 
-def error_handler(f):
-    @wraps(f)
-    def decorator(*args, **kwargs):
+def check_expired_trainings() -> Dict:
+    """
+    Check all trainings of all members. Send email notification and remove training if it's expired.
+    Report of the run is printed as JSON, saved to REPORT_PATH and appended to RUN_HISTORY_PATH.
+    :return: report of the run
+    """
+    report = RunReport()
+
+    with span("expiration run"):
         try:
-            return f(*args, **kwargs)
+            check_expired_trainings_inner(report)
 
-        except Exception:
+        except Exception as e:
             print(traceback.format_exc())
+            report.failure(f'run: {e.__class__.__name__}')
+            report.finish("error")
 
-    return decorator
+    if report.duration is None:
+        report.finish()
 
+    data = report.to_dict()
+    print(json.dumps(data))
+    report.save(REPORT_PATH, RUN_HISTORY_PATH)
+
+    return data
 
-@error_handler
-def check_expired_trainings():
-    """
-    Check all trainings of all members. Send email notification and remove training if it's expired.
-    """
-    if requests.get(f'{RAILWAY_API_URL}/health').status_code != 200:
-        return
 
-    if os.getenv("TEST_USER"):
-        members = [data_from_get_request(
-            f'https://fabman.io/api/v1/members/{os.getenv("TEST_USER")}?embed=trainings',
-            os.getenv("FABMAN_API_KEY")
-        )]
+def check_expired_trainings_inner(report: RunReport) -> None:
+    global _expirations
 
-    else:
-        members = data_from_get_request("https://fabman.io/api/v1/members?embed=trainings", os.getenv("FABMAN_API_KEY"))
+    with report.phase("health_check"), report.call("bridge GET /health"):
+        healthy = session.get(f'{RAILWAY_API_URL}/health', timeout=BRIDGE_TIMEOUT).status_code == 200
 
-    checked_trainings = 0
-    expired_trainings = 0
+    if not healthy:
+        report.failure("health_check: bridge is down")
+        report.finish("skipped")
 
-    for m in members:
-        for t in m["_embedded"]["trainings"]:
-            checked_trainings += 1
+        return
 
-            if not (expired_date(t["untilDate"]) if t.get("untilDate") else False):
-                print(f'training {t["trainingCourse"]} is not expired for user {m["id"]}')
+    with report.phase("member_fetch"):
+        if os.getenv("TEST_USER"):
+            members = [data_from_get_request(
+                f'https://fabman.io/api/v1/members/{os.getenv("TEST_USER")}?embed=trainings',
+                os.getenv("FABMAN_API_KEY"),
+                report
+            )]
+
+        else:
+            members = data_from_get_request(
+                "https://fabman.io/api/v1/members?embed=trainings",
+                os.getenv("FABMAN_API_KEY"),
+                report
+            )
+
+    expired = []
+    expirations = []
+    engine = ExpirationEngine()
+
+    with report.phase("evaluation"):
+        trainings = [(m["id"], t) for m in members for t in m["_embedded"]["trainings"]]
+
+        expired_mask = engine.expired_mask([t.get("untilDate") for _, t in trainings])
+
+        for (member_id, t), is_expired in zip(trainings, expired_mask):
+            if is_expired:
+                expired.append((member_id, t))
                 continue
 
-            expired_trainings += 1
+            if VERBOSE:
+                print(f'training {t["trainingCourse"]} is not expired for user {member_id}')
+
+            expirations.append((t.get("untilDate"), (member_id, t["id"])))
+
+        _expirations = ExpirationIndex(expirations)
+        _notified.intersection_update(t["id"] for _, t in expired)
+
+    report.count("members", len(members))
+    report.count("checked", len(trainings))
+    report.count("expired", len(expired))
+
+    with report.phase("notifications"):
+        for member_id, t in expired:
+            if t["id"] in _notified:
+                report.count("already_notified")
+
+            elif send_expiration_notification(member_id, t["trainingCourse"], report):
+                report.count("notified")
+                _notified.add(t["id"])
+
+    with report.phase("removals"):
+        for member_id, t in expired:
+            if t["id"] in _notified and remove_expired_course(member_id, t["id"], report):
+                report.count("removed")
+                _notified.discard(t["id"])
+
+    print(f'Checked {report.counts["checked"]} trainings of {len(members)} members. Expired {len(expired)} trainings.')
+
+
+def backlog(until: datetime) -> Dict:
+    """
+    Work waiting for daemon: trainings notified but not removed yet and trainings expiring before the next run.
+    :param until: datetime of the next run
+    :return: counts of trainings
+    """
+    return {
+        "pending_removals": len(_notified),
+        "expiring_before_next_run": _expirations.count_before(until.date()),
+        "expiring_within_7_days": len(_expirations.expiring_within(7))
+    }
+
+
+def main():
+    """
+    Run expiration check once (cron mode) or start daemon when SCHEDULE_CRON or SCHEDULE_INTERVAL is set.
+    """
+    if not SCHEDULE_CRON and not SCHEDULE_INTERVAL:
+        check_expired_trainings()
+        return
+
+    daemon = Daemon(
+        check_expired_trainings,
+        CronSchedule(SCHEDULE_CRON) if SCHEDULE_CRON else IntervalSchedule(SCHEDULE_INTERVAL),
+        backlog,
+        RUN_ON_START
+    )
 
-            if send_expiration_notification(m["id"], t["trainingCourse"]):
-                remove_expired_course(m["id"], t["id"])
+    if STATUS_PORT:
+        daemon.start_status_server(STATUS_HOST, STATUS_PORT)
 
-    print(f'Checked {checked_trainings} trainings of {len(members)} members. Expired {expired_trainings} trainings.')
+    daemon.serve_forever()
 
 
 if __name__ == "__main__":
-    check_expired_trainings()
+    main()
@@ -0,0 +1,121 @@
+import json
+import math
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile.
+    :param values: sorted values
+    :param p: percentile (0-100)
+    :return: value of percentile
+    """
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class RunReport:
+    """
+    Structured report of one expiration run: timings of phases, latencies of calls, counts and failures by cause.
+    """
+
+    def __init__(self):
+        self.start = datetime.now()
+        self._start = time.perf_counter()
+        self.duration = None
+        self._elapsed = None
+        self.status = "ok"
+        self.phases: Dict[str, float] = {}
+        self.calls: Dict[str, List[float]] = defaultdict(list)
+        self.counts: Counter = Counter()
+        self.failures: Counter = Counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.phases[name] = round(self.phases.get(name, 0) + time.perf_counter() - start, 3)
+
+    @contextmanager
+    def call(self, name: str):
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.calls[name].append(time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counts[name] += value
+
+    def failure(self, cause: str) -> None:
+        self.failures[cause] += 1
+
+    def finish(self, status: str = None) -> None:
+        self._elapsed = time.perf_counter() - self._start
+        self.duration = round(self._elapsed, 3)
+        self.status = status or ("partial" if self.failures else "ok")
+
+    def to_dict(self) -> Dict:
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._start
+        calls = {}
+
+        for name, latencies in self.calls.items():
+            latencies = sorted(latencies)
+            calls[name] = {
+                "count": len(latencies),
+                **{f'p{p}': round(percentile(latencies, p), 4) for p in PERCENTILES},
+                "max": round(latencies[-1], 4)
+            }
+
+        return {
+            "start": self.start.isoformat(timespec="seconds"),
+            "duration": round(elapsed, 3),
+            "status": self.status,
+            "phases": self.phases,
+            "calls": calls,
+            "throughput": {
+                f'{name}_per_s': round(self.counts[name] / elapsed, 2) if elapsed else 0.0
+                for name in ("members", "checked")
+            },
+            "counts": dict(self.counts),
+            "failures": dict(self.failures)
+        }
+
+    def history_row(self) -> Dict:
+        """
+        Compact row of run history (for charts of run duration by count of members).
+        """
+        return {
+            "start": self.start.isoformat(timespec="seconds"),
+            "duration": self.duration,
+            "status": self.status,
+            "members": self.counts["members"],
+            "checked": self.counts["checked"],
+            "expired": self.counts["expired"],
+            "failures": sum(self.failures.values()),
+            "phases": self.phases
+        }
+
+    def save(self, report_path: str = None, history_path: str = None) -> None:
+        """
+        Write report to report_path (overwritten by every run) and append row to history_path (JSON lines).
+        """
+        if report_path:
+            with open(report_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+
+        if history_path:
+            with open(history_path, "a") as f:
+                f.write(f'{json.dumps(self.history_row())}\n')
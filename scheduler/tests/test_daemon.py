@@ -0,0 +1,85 @@
+"""
+Schedules and overlap protection of scheduler daemon.
+"""
+import unittest
+from datetime import datetime
+from threading import Event, Thread
+
+from daemon import CronSchedule, Daemon, IntervalSchedule
+
+
+class CronScheduleTest(unittest.TestCase):
+    def test_fields_support_lists_ranges_and_steps(self):
+        schedule = CronSchedule("*/15 2-4 * * 1,3,5")
+
+        self.assertEqual(schedule.minutes, {0, 15, 30, 45})
+        self.assertEqual(schedule.hours, {2, 3, 4})
+        self.assertEqual(schedule.weekdays, {1, 3, 5})
+
+    def test_next_run(self):
+        # 2024-01-01 is Monday
+        self.assertEqual(CronSchedule("30 3 * * *").next_after(datetime(2024, 1, 1, 3, 30)),
+                         datetime(2024, 1, 2, 3, 30))
+        self.assertEqual(CronSchedule("0 6 * * 0").next_after(datetime(2024, 1, 1, 12, 0)),
+                         datetime(2024, 1, 7, 6, 0))
+        self.assertEqual(CronSchedule("0 0 1 * *").next_after(datetime(2024, 1, 31, 23, 59, 30)),
+                         datetime(2024, 2, 1, 0, 0))
+
+    def test_sunday_is_0_or_7(self):
+        self.assertEqual(CronSchedule("0 6 * * 7").weekdays, {0})
+
+    def test_day_of_month_or_weekday_when_both_are_restricted(self):
+        schedule = CronSchedule("0 0 13 * 5")
+
+        # Friday 2024-01-05 matches by weekday, 2024-01-13 (Saturday) by day of month
+        self.assertEqual(schedule.next_after(datetime(2024, 1, 1)), datetime(2024, 1, 5))
+        self.assertEqual(schedule.next_after(datetime(2024, 1, 12, 1)), datetime(2024, 1, 13))
+
+    def test_invalid_expressions_are_rejected(self):
+        for expression in ("* * * *", "60 * * * *", "*/0 * * * *", "*/x * * * *", "5-1 * * * *"):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                CronSchedule(expression)
+
+    def test_never_matching_expression(self):
+        with self.assertRaises(ValueError):
+            CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
+
+    def test_interval(self):
+        self.assertEqual(IntervalSchedule(90).next_after(datetime(2024, 1, 1)), datetime(2024, 1, 1, 0, 1, 30))
+
+        with self.assertRaises(ValueError):
+            IntervalSchedule(0)
+
+
+class DaemonTest(unittest.TestCase):
+    def test_overlapping_run_is_skipped(self):
+        started, finish = Event(), Event()
+
+        def job():
+            started.set()
+            finish.wait(5)
+
+            return {"members": 1}
+
+        daemon = Daemon(job, IntervalSchedule(60))
+        thread = Thread(target=daemon.run_once)
+        thread.start()
+        started.wait(5)
+
+        self.assertFalse(daemon.run_once())
+
+        finish.set()
+        thread.join()
+
+        self.assertEqual((daemon.runs, daemon.skipped), (1, 1))
+        self.assertEqual(daemon.last_run["result"], {"members": 1})
+
+    def test_failed_run_is_recorded(self):
+        daemon = Daemon(lambda: 1 / 0, IntervalSchedule(60))
+
+        self.assertTrue(daemon.run_once())
+        self.assertEqual(daemon.last_run["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+"""
+Scheduler copy of expiration engine has to stay identical to the bridge module.
+"""
+import os
+import unittest
+
+SCHEDULER_COPY = os.path.join(os.path.dirname(__file__), "..", "expiration.py")
+BRIDGE_MODULE = os.path.join(os.path.dirname(__file__), "..", "..", "bridge", "application", "services", "expiration.py")
+
+
+class ExpirationCopyTest(unittest.TestCase):
+    @unittest.skipUnless(os.path.exists(BRIDGE_MODULE), "bridge is not checked out next to scheduler")
+    def test_copy_is_in_sync_with_bridge(self):
+        with open(SCHEDULER_COPY, encoding="utf-8") as f:
+            header, copy = f.readline(), f.read()
+
+        with open(BRIDGE_MODULE, encoding="utf-8") as f:
+            original = f.read()
+
+        self.assertTrue(header.startswith("# copy of bridge/application/services/expiration.py"))
+        self.assertEqual(copy, original, "scheduler/expiration.py differs from bridge, copy the bridge module again")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Calls of scheduler to Fabman and bridge (HTTP session is mocked).
+Run from scheduler directory: python -m unittest discover tests
+"""
+import unittest
+from unittest import mock
+
+import requests
+
+import main_run
+from report import RunReport
+
+
+def response(status: int) -> requests.Response:
+    res = requests.Response()
+    res.status_code = status
+    res._content = b""
+
+    return res
+
+
+class RemoveExpiredCourseTest(unittest.TestCase):
+    def remove(self, delete_status: int):
+        with mock.patch.object(main_run.session, "delete", return_value=response(delete_status)),\
+                mock.patch.object(main_run.session, "post", return_value=response(200)) as post:
+            removed = main_run.remove_expired_course(5, 100, RunReport())
+
+        return removed, post
+
+    def test_removal_invalidates_member_in_bridge(self):
+        removed, post = self.remove(204)
+
+        self.assertTrue(removed)
+        post.assert_called_once()
+        self.assertTrue(post.call_args.args[0].endswith("/member_changed"))
+        self.assertEqual(post.call_args.kwargs["json"], {"member_id": 5})
+
+    def test_failed_removal_doesnt_call_bridge(self):
+        removed, post = self.remove(500)
+
+        self.assertFalse(removed)
+        post.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()